@@ -0,0 +1,76 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Deque, Optional
+
+def backend_name(agent) -> str:
+    """Model id the agent calls, so agents sharing a model share a circuit breaker"""
+    model = getattr(agent, "model", None)
+    config = getattr(model, "config", None)
+    if isinstance(config, dict) and config.get("model_id"):
+        return str(config["model_id"])
+    return type(model if model is not None else agent).__name__
+
+class AgentPool:
+    """Up to size instances of one agent, checked out one call at a time.
+
+    A Strands Agent instance rejects a second concurrent call, so every call
+    (retries and hedges included) runs on an instance of its own. Instances are
+    created on demand; when all size are busy, callers wait for one to be returned.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int):
+        self.factory = factory
+        self.size = max(1, size)
+        # One instance up front identifies the backend and catches configuration errors at startup
+        self._idle: Deque[Any] = deque([factory()])
+        self._created = 1
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.backend = backend_name(self._idle[0])
+
+    @property
+    def in_use(self) -> int:
+        return self._created - len(self._idle)
+
+    def try_acquire(self) -> Optional[Any]:
+        """An instance if one is free or may still be created, otherwise None"""
+        if self._idle:
+            return self._idle.popleft()
+        if self._created < self.size:
+            self._created += 1
+            return self.factory()
+        return None
+
+    async def acquire(self) -> Any:
+        agent = self.try_acquire() if not self._waiters else None
+        if agent is not None:
+            return agent
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Handed an instance just as the caller gave up: pass it on
+                self.release(waiter.result())
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self, agent: Any) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(agent)
+                return
+        self._idle.append(agent)
+
+    @asynccontextmanager
+    async def checkout(self):
+        """Hold an instance for the duration of the block"""
+        agent = await self.acquire()
+        try:
+            yield agent
+        finally:
+            self.release(agent)
@@ -0,0 +1,235 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from agent.tool_cache import normalize_argument
+from monitoring import metrics
+
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE_SIZE = int(os.environ.get("ANSWER_CACHE_SIZE", 1000))
+ANSWER_CACHE_TTL_SECONDS = float(os.environ.get("ANSWER_CACHE_TTL_SECONDS", 3600))
+# How long a disk cache call on the event loop may wait for another worker's write lock
+ANSWER_CACHE_BUSY_TIMEOUT_SECONDS = float(os.environ.get("ANSWER_CACHE_BUSY_TIMEOUT_SECONDS", 0.05))
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    return "locked" in str(error) or "busy" in str(error)
+
+def answer_key(version: str, question: str, location: str) -> str:
+    """Cache key of an advisor answer: answer version plus normalized question and location"""
+    return "|".join((version, normalize_argument(location or "general"), normalize_argument(question)))
+
+class AnswerCache:
+    """In-process LRU of advisor answers to context-free questions, with a TTL per entry"""
+
+    def __init__(self, maxsize: int = ANSWER_CACHE_SIZE, ttl: float = ANSWER_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        metrics.record_cache("answer", entry is not None)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: str, answer: str, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "ttl": self.ttl}
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SQLiteAnswerCache:
+    """Advisor answers in a SQLite file, shared by every worker on a node and kept across restarts.
+
+    Eviction is LRU by last use, which is written at most once per touch_seconds
+    per entry so that hits stay cheap reads. Expiry uses wall-clock time, since
+    entries are shared between processes. Calls run on the event loop, so they
+    wait at most busy_timeout for another worker's lock: a locked read is a miss
+    and a locked write is skipped.
+    """
+
+    def __init__(self, path: str, maxsize: int = 10000, ttl: float = ANSWER_CACHE_TTL_SECONDS,
+                 touch_seconds: float = 60.0, busy_timeout: float = ANSWER_CACHE_BUSY_TIMEOUT_SECONDS):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.touch_seconds = touch_seconds
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Setup may wait as long as it takes: it runs once, before the worker serves requests
+        self._ready = False
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "key TEXT PRIMARY KEY, answer TEXT NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used)")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+        self._ready = True
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets workers read while another one writes"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Switching to WAL takes a lock, so a new connection waits like setup does
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if self._ready:
+                conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    def get_entry(self, key: str) -> Optional[tuple]:
+        """(answer, seconds left to live) of a live entry, or None"""
+        conn = self._connection()
+        now = time.time()
+        try:
+            row = conn.execute(
+                "SELECT answer, expires_at, last_used FROM answers WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+        except sqlite3.OperationalError as e:
+            if not _is_busy(e):
+                raise
+            logger.warning("answer_cache_busy", extra={"operation": "get"})
+            row = None
+        metrics.record_cache("answer_disk", row is not None)
+        if row is None:
+            return None
+        if now - row[2] > self.touch_seconds:
+            try:
+                conn.execute("UPDATE answers SET last_used = ? WHERE key = ?", (now, key))
+            except sqlite3.OperationalError as e:
+                # A later hit records the use instead
+                if not _is_busy(e):
+                    raise
+        return row[0], row[1] - now
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def set(self, key: str, answer: str) -> None:
+        conn = self._connection()
+        now = time.time()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO answers (key, answer, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, answer, now + self.ttl, now)
+            )
+            conn.execute("DELETE FROM answers WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "DELETE FROM answers WHERE key IN "
+                "(SELECT key FROM answers ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.maxsize,)
+            )
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            if not (isinstance(e, sqlite3.OperationalError) and _is_busy(e)):
+                raise
+            # The answer is still in this worker's memory cache; the next miss elsewhere recomputes it
+            logger.warning("answer_cache_busy", extra={"operation": "set"})
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM answers")
+
+    def stats(self) -> Dict:
+        size = self._connection().execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        return {"size": size, "maxsize": self.maxsize, "ttl": self.ttl, "path": self.path}
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            return self._connection().execute(
+                "SELECT 1 FROM answers WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone() is not None
+        except sqlite3.OperationalError as e:
+            if not _is_busy(e):
+                raise
+            return False
+
+class TieredAnswerCache:
+    """The in-process cache in front of the shared disk cache; disk hits are copied into memory"""
+
+    def __init__(self, memory: AnswerCache, disk: SQLiteAnswerCache):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[str]:
+        answer = self.memory.get(key)
+        if answer is not None:
+            return answer
+        entry = self.disk.get_entry(key)
+        if entry is None:
+            return None
+        # Never keep the copy longer than the disk entry lives
+        self.memory.set(key, entry[0], ttl=min(self.memory.ttl, entry[1]))
+        return entry[0]
+
+    def set(self, key: str, answer: str) -> None:
+        self.memory.set(key, answer)
+        self.disk.set(key, answer)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.disk.clear()
+
+    def stats(self) -> Dict:
+        return {"memory": self.memory.stats(), "disk": self.disk.stats()}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.memory or key in self.disk
+
+    def __len__(self) -> int:
+        return len(self.memory)
+
+def create_answer_cache():
+    """Create the cache selected by ANSWER_CACHE_BACKEND (memory, or sqlite behind a memory cache)"""
+    backend = os.environ.get("ANSWER_CACHE_BACKEND", "memory").lower()
+
+    if backend == "memory":
+        return AnswerCache()
+    elif backend == "sqlite":
+        return TieredAnswerCache(AnswerCache(), SQLiteAnswerCache(
+            os.environ.get("ANSWER_CACHE_DB_PATH", "runtime/answer_cache.db"),
+            maxsize=int(os.environ.get("ANSWER_CACHE_DISK_SIZE", 10000))
+        ))
+    else:
+        raise ValueError(f"Unknown ANSWER_CACHE_BACKEND: {backend}")
+
+# Global answer cache for /ask/direct
+answer_cache = create_answer_cache()
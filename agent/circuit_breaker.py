@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from monitoring import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+circuit_transitions = metrics.registry.counter(
+    "circuit_breaker_transitions_total", "Circuit breaker state changes by backend", ("backend", "state")
+)
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a backend whose circuit is open"""
+
+    def __init__(self, backend: str):
+        super().__init__(f"Circuit open for {backend}")
+        self.backend = backend
+
+class CircuitBreaker:
+    """Stops calls to a failing backend for a while, then lets a single trial call through.
+
+    The circuit opens after failure_threshold consecutive failures. Once
+    reset_seconds have passed, one trial call is allowed (half open): success
+    closes the circuit, failure opens it again for another reset_seconds.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            circuit_transitions.inc(self.name, state)
+
+    def allow(self) -> bool:
+        """Whether a call may go to the backend now; a True in half open state claims the trial call"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self._set_state(HALF_OPEN)
+                self._trial_running = False
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._trial_running = False
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def record_cancelled(self) -> None:
+        """Release a trial call that ended without telling us anything about the backend"""
+        with self._lock:
+            self._trial_running = False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"state": self.state, "failures": self.failures}
+
+# One breaker per model backend, shared by everything calling it in this worker
+_breakers: Dict[str, CircuitBreaker] = {}
+
+def get_breaker(backend: str, failure_threshold: Optional[int] = None, reset_seconds: Optional[float] = None) -> CircuitBreaker:
+    """The breaker for a backend, created from CIRCUIT_* settings on first use"""
+    breaker = _breakers.get(backend)
+    if breaker is None:
+        breaker = _breakers.setdefault(backend, CircuitBreaker(
+            backend,
+            failure_threshold or int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", 5)),
+            reset_seconds or float(os.environ.get("CIRCUIT_RESET_SECONDS", 30))
+        ))
+    return breaker
+
+metrics.registry.gauge(
+    "circuit_breaker_open", "1 while a backend's circuit is open or half open",
+    lambda: {(name,): 0 if breaker.state == CLOSED else 1 for name, breaker in list(_breakers.items())},
+    ("backend",)
+)
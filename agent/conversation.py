@@ -0,0 +1,129 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from strands.agent.conversation_manager import NullConversationManager
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting prompts"""
+    return len(text) // 4 + 1
+
+def first_sentence(text: str, limit: int) -> str:
+    """First sentence of text on one line, cut to limit characters"""
+    sentence = re.split(r"(?<=[.!?])\s", " ".join(text.split()), maxsplit=1)[0]
+    return sentence if len(sentence) <= limit else sentence[:limit - 3].rstrip() + "..."
+
+class StatelessConversationManager(NullConversationManager):
+    """Clears a shared agent's messages after each call; per-user history lives in ConversationStore"""
+
+    def apply_management(self, agent: "Any", **kwargs: Any) -> None:
+        agent.messages.clear()
+
+class ConversationStore:
+    """Bounded per-session chat history that fits each prompt into a token budget.
+
+    Each session keeps a sliding window of recent exchanges; exchanges that fall
+    out of the window or the budget are folded into a short extractive summary.
+    Sessions expire after ttl_seconds and the least recently used are evicted
+    beyond max_sessions. Sessions are per worker process.
+    """
+
+    def __init__(self, max_sessions: int = 1000, ttl_seconds: float = 1800, token_budget: int = 1500,
+                 max_turns: int = 6, summarize: bool = True):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.token_budget = token_budget
+        self.max_turns = max_turns
+        self.summarize = summarize
+        self._sessions: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, session_id: str) -> Optional[Dict]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        if time.monotonic() - session["last_used"] > self.ttl_seconds:
+            del self._sessions[session_id]
+            return None
+        self._sessions.move_to_end(session_id)
+        return session
+
+    @staticmethod
+    def _tokens(session: Dict) -> int:
+        return sum(turn["tokens"] for turn in session["turns"]) + sum(estimate_tokens(line) for line in session["summary"])
+
+    def record(self, session_id: str, question: str, answer: str) -> None:
+        """Add an exchange, then slide the window until the session fits its limits"""
+        # A single answer may use at most half the budget
+        answer_limit = self.token_budget * 2
+        if len(answer) > answer_limit:
+            answer = answer[:answer_limit].rstrip() + "..."
+        turn = {"question": question, "answer": answer, "tokens": estimate_tokens(question) + estimate_tokens(answer)}
+
+        with self._lock:
+            session = self._get(session_id)
+            if session is None:
+                session = {"turns": [], "summary": []}
+                self._sessions[session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            session["last_used"] = time.monotonic()
+            session["turns"].append(turn)
+
+            while len(session["turns"]) > 1 and (
+                len(session["turns"]) > self.max_turns or self._tokens(session) > self.token_budget
+            ):
+                oldest = session["turns"].pop(0)
+                if self.summarize:
+                    session["summary"].append(
+                        f"Asked: {first_sentence(oldest['question'], 120)} "
+                        f"Advised: {first_sentence(oldest['answer'], 160)}"
+                    )
+            # The summary gets at most a quarter of the budget; the oldest lines go first
+            while session["summary"] and sum(estimate_tokens(line) for line in session["summary"]) > self.token_budget // 4:
+                session["summary"].pop(0)
+
+    def build_prompt(self, session_id: Optional[str], question: str) -> str:
+        """The question, preceded by the session's summary and recent exchanges if it has any"""
+        if not session_id:
+            return question
+
+        with self._lock:
+            session = self._get(session_id)
+            if session is None or not (session["turns"] or session["summary"]):
+                return question
+            summary = list(session["summary"])
+            turns = list(session["turns"])
+
+        parts: List[str] = []
+        if summary:
+            parts.append("Earlier in this conversation:\n" + "\n".join(f"- {line}" for line in summary))
+        if turns:
+            parts.append("Recent exchanges:\n" + "\n\n".join(
+                f"User: {turn['question']}\nAdvisor: {turn['answer']}" for turn in turns
+            ))
+        parts.append(f"Current question: {question}")
+        return "\n\n".join(parts)
+
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+def create_conversation_store() -> ConversationStore:
+    """Store configured from the CONVERSATION_* environment variables"""
+    return ConversationStore(
+        max_sessions=int(os.environ.get("CONVERSATION_MAX_SESSIONS", 1000)),
+        ttl_seconds=float(os.environ.get("CONVERSATION_TTL_SECONDS", 1800)),
+        token_budget=int(os.environ.get("CONVERSATION_TOKEN_BUDGET", 1500)),
+        max_turns=int(os.environ.get("CONVERSATION_MAX_TURNS", 6)),
+        summarize=os.environ.get("CONVERSATION_SUMMARY", "on").lower() != "off"
+    )
+
+# Global conversation store for the advisor endpoints
+conversation_store = create_conversation_store()
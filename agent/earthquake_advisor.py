@@ -2,17 +2,27 @@ from strands import Agent, tool
 import json
 import os
 
+from agent.conversation import StatelessConversationManager
+from agent.tool_cache import memoize_tool
+from agent.tool_output import agent_output, compact_json, output_mode
+from monitoring.instrumentation import instrument_tool
+from storage.versioning import content_version
+
 # Load community data
 def load_community_data():
     try:
-        with open("data/community_data.json", "r") as f:
+        with open(os.environ.get("COMMUNITY_DATA_FILE", "data/community_data.json"), "r") as f:
             return json.load(f)
     except FileNotFoundError:
         return {}
 
 COMMUNITY_DATA = load_community_data()
+COMMUNITY_DATA_VERSION = content_version(COMMUNITY_DATA)
 
 @tool
+@instrument_tool
+@agent_output
+@memoize_tool(version=lambda: COMMUNITY_DATA_VERSION)
 def get_emergency_contacts(location: str = "general") -> str:
     """
     Get emergency contact numbers for a specific location.
@@ -25,6 +35,16 @@ def get_emergency_contacts(location: str = "general") -> str:
     """
     contacts = COMMUNITY_DATA.get("emergency_contacts", {})
     
+    if output_mode() == "compact":
+        region = {"bangkok": "thailand", "yangon": "myanmar"}.get(location.lower(), location.lower())
+        if region not in ("thailand", "myanmar"):
+            return compact_json({
+                "region": "international",
+                "contacts": contacts.get("international", {}),
+                "note": "specify thailand or myanmar for local contacts"
+            })
+        return compact_json({"region": region, "contacts": contacts.get(region, {})})
+    
     if location.lower() in ["thailand", "bangkok"]:
         thai_contacts = contacts.get("thailand", {})
         return f"""Thailand Emergency Contacts:
@@ -52,6 +72,9 @@ def get_emergency_contacts(location: str = "general") -> str:
 For local contacts, specify 'thailand' or 'myanmar'."""
 
 @tool
+@instrument_tool
+@agent_output
+@memoize_tool(version=lambda: COMMUNITY_DATA_VERSION)
 def get_earthquake_safety_advice(situation: str) -> str:
     """
     Provides specific earthquake safety advice based on the situation.
@@ -127,6 +150,9 @@ Teachers: Lead by example, give clear directions."""
 Remember: Most injuries occur when people try to move during earthquakes."""
 
 @tool
+@instrument_tool
+@agent_output
+@memoize_tool(version=lambda: COMMUNITY_DATA_VERSION)
 def find_nearest_hospital(location: str) -> str:
     """
     Find nearest hospitals with emergency services.
@@ -140,6 +166,24 @@ def find_nearest_hospital(location: str) -> str:
     hospitals = COMMUNITY_DATA.get("hospitals", {})
     location_lower = location.lower()
     
+    if output_mode() == "compact":
+        city = None
+        if "bangkok" in location_lower or "thailand" in location_lower:
+            city = "bangkok"
+        elif "yangon" in location_lower or "myanmar" in location_lower:
+            city = "yangon"
+        if city:
+            return compact_json({"city": city, "hospitals": [
+                {
+                    "name": hospital.get("name"),
+                    "phone": hospital.get("phone"),
+                    "address": hospital.get("address"),
+                    **({"emergency_24h": True} if hospital.get("emergency_24h") else {}),
+                    **({"trauma_center": True} if hospital.get("trauma_center") else {})
+                }
+                for hospital in hospitals.get(city, [])
+            ]})
+    
     if "bangkok" in location_lower or "thailand" in location_lower:
         bangkok_hospitals = hospitals.get("bangkok", [])
         result = "🏥 BANGKOK EMERGENCY HOSPITALS:\n\n"
@@ -172,6 +216,9 @@ def find_nearest_hospital(location: str) -> str:
         return "Please specify your location (Bangkok or Yangon) to find nearby hospitals."
 
 @tool
+@instrument_tool
+@agent_output
+@memoize_tool(version=lambda: COMMUNITY_DATA_VERSION)
 def get_evacuation_centers(location: str) -> str:
     """
     Get information about evacuation centers and safe areas.
@@ -185,6 +232,23 @@ def get_evacuation_centers(location: str) -> str:
     centers = COMMUNITY_DATA.get("evacuation_centers", {})
     location_lower = location.lower()
     
+    if output_mode() == "compact":
+        city = None
+        if "bangkok" in location_lower:
+            city = "bangkok"
+        elif "yangon" in location_lower:
+            city = "yangon"
+        if city:
+            return compact_json({"city": city, "centers": [
+                {
+                    "name": center.get("name"),
+                    "address": center.get("address"),
+                    "capacity": center.get("capacity"),
+                    "facilities": center.get("facilities", [])
+                }
+                for center in centers.get(city, [])
+            ]})
+    
     if "bangkok" in location_lower:
         bangkok_centers = centers.get("bangkok", [])
         result = "🏕️ BANGKOK EVACUATION CENTERS:\n\n"
@@ -215,6 +279,9 @@ def get_evacuation_centers(location: str) -> str:
         return "Please specify your location (Bangkok or Yangon) to find evacuation centers."
 
 @tool
+@instrument_tool
+@agent_output
+@memoize_tool(version=lambda: COMMUNITY_DATA_VERSION)
 def check_building_safety(building_description: str) -> str:
     """
     Provide guidance on assessing building safety after an earthquake.
@@ -250,13 +317,20 @@ def check_building_safety(building_description: str) -> str:
 🚨 WHEN IN DOUBT, GET OUT!
 Don't risk your life for belongings."""
 
-# Create an enhanced agent with multiple tools
-earthquake_advisor_agent = Agent(
-    tools=[
-        get_earthquake_safety_advice,
-        get_emergency_contacts,
-        find_nearest_hospital,
-        get_evacuation_centers,
-        check_building_safety
-    ]
-) 
\ No newline at end of file
+def create_advisor_agent() -> Agent:
+    """Create an enhanced agent with multiple tools"""
+    return Agent(
+        tools=[
+            get_earthquake_safety_advice,
+            get_emergency_contacts,
+            find_nearest_hospital,
+            get_evacuation_centers,
+            check_building_safety
+        ],
+        # Shared by all users: per-session history is passed in the prompt instead
+        conversation_manager=StatelessConversationManager(),
+        # call_agent retries within the caller's deadline; Strands' own retries would wait past it
+        retry_strategy=None
+    )
+
+earthquake_advisor_agent = create_advisor_agent() 
\ No newline at end of file
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import os
+import re
+from typing import AsyncIterator, List, Optional, Tuple
+
+from agent.agent_pool import AgentPool
+from agent.circuit_breaker import CircuitOpen
+from agent.earthquake_advisor import (
+    check_building_safety,
+    create_advisor_agent,
+    find_nearest_hospital,
+    get_earthquake_safety_advice,
+    get_emergency_contacts,
+    get_evacuation_centers
+)
+from agent.resilience import call_agent, stream_agent_events
+from monitoring import metrics
+
+logger = logging.getLogger(__name__)
+
+# Advisor calls allowed in flight per worker, each on an agent instance of its own; further
+# requests get the rule-based answer
+MAX_INFLIGHT_AGENT_CALLS = max(1, int(os.environ.get("MAX_INFLIGHT_AGENT_CALLS", 32)))
+
+FALLBACK_NOTE = "The AI advisor is unavailable right now, so this is standard earthquake guidance."
+
+# Keywords are matched against whole words; a trailing * matches any word starting with the stem
+# ("driv*" matches drive and driver), and a keyword of several words matches them in sequence.
+# Situations are the ones the advice tool knows.
+SITUATION_KEYWORDS = {
+    "sleeping": ("sleep*", "asleep", "bed", "beds", "bedroom*", "night", "nights", "tonight"),
+    "office": ("office*", "work", "working", "workplace", "desk*"),
+    "outside": ("outside", "outdoor*", "street*"),
+    "driving": ("driv*", "car", "cars", "vehicle*"),
+    "school": ("school*", "classroom*", "student*")
+}
+HOSPITAL_KEYWORDS = ("hospital*", "injur*", "medical", "doctor*", "bleed*", "hurt*", "ambulance*")
+EVACUATION_KEYWORDS = ("evacuat*", "shelter*", "center", "centers", "centre", "centres", "where to go", "safe area*")
+CONTACT_KEYWORDS = ("contact*", "phone*", "number", "numbers", "call", "calling", "hotline*", "police")
+BUILDING_KEYWORDS = ("crack*", "damage*", "collaps*", "gas", "safe to enter", "go back inside", "structur*")
+KNOWN_LOCATIONS = ("bangkok", "thailand", "yangon", "myanmar")
+
+fallback_answers = metrics.registry.counter(
+    "advisor_fallbacks_total", "Advisor questions answered by the rule-based responder", ("reason",)
+)
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"[a-z]+", text.lower())
+
+def _matches(word: str, keyword: str) -> bool:
+    if keyword.endswith("*"):
+        return word.startswith(keyword[:-1])
+    return word == keyword
+
+def _mentions(words: List[str], keywords) -> bool:
+    for keyword in keywords:
+        parts = keyword.split(" ")
+        for i in range(len(words) - len(parts) + 1):
+            if all(_matches(word, part) for word, part in zip(words[i:], parts)):
+                return True
+    return False
+
+def rule_based_answer(question: str, location: str = "general") -> str:
+    """Answer from the advisor's own tools using keyword rules, without calling the model"""
+    words = _words(question)
+    location = (location or "general").lower()
+    if location == "general":
+        location = next((place for place in KNOWN_LOCATIONS if place in words), "general")
+
+    sections: List[str] = []
+    if _mentions(words, HOSPITAL_KEYWORDS):
+        sections.append(find_nearest_hospital(location))
+    if _mentions(words, EVACUATION_KEYWORDS):
+        sections.append(get_evacuation_centers(location))
+    if _mentions(words, BUILDING_KEYWORDS):
+        sections.append(check_building_safety(question))
+    if not sections:
+        # The tool matches loosely on its input, so it only ever gets a situation name
+        situation = next(
+            (name for name, keywords in SITUATION_KEYWORDS.items() if _mentions(words, keywords)),
+            "general"
+        )
+        sections.append(get_earthquake_safety_advice(situation))
+    # Contacts are short and always useful in an emergency
+    if location != "general" or _mentions(words, CONTACT_KEYWORDS):
+        sections.append(get_emergency_contacts(location))
+    return "\n\n".join(section.strip() for section in sections)
+
+class AdmissionLimit:
+    """Non-blocking cap on concurrent agent calls in this worker; excess calls are shed, not queued"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.inflight = 0
+
+    def try_acquire(self) -> bool:
+        if self.inflight >= self.limit:
+            return False
+        self.inflight += 1
+        return True
+
+    def release(self) -> None:
+        self.inflight -= 1
+
+# One advisor instance per admitted call, so an admitted call never waits for an instance
+advisor_pool = AgentPool(create_advisor_agent, MAX_INFLIGHT_AGENT_CALLS)
+advisor_admission = AdmissionLimit(advisor_pool.size)
+
+metrics.registry.gauge(
+    "advisor_calls_inflight", "Advisor agent calls in flight in this worker",
+    lambda: {(): advisor_admission.inflight}
+)
+
+def _fallback(reason: str, question: str, location: str) -> str:
+    fallback_answers.inc(reason)
+    logger.warning("advisor_fallback", extra={"reason": reason, "location": location})
+    return rule_based_answer(question, location)
+
+async def ask_with_fallback(pool: AgentPool, prompt: str, question: str, location: str) -> Tuple[object, Optional[str]]:
+    """The advisor's answer, or the rule-based one if the model fails, times out or is unavailable.
+
+    Returns (response, fallback_reason); the reason is None when the model answered.
+    """
+    if not advisor_admission.try_acquire():
+        return _fallback("shed", question, location), "shed"
+
+    try:
+        return await call_agent("advisor", pool, prompt), None
+    except CircuitOpen:
+        reason = "circuit_open"
+    except asyncio.TimeoutError:
+        reason = "timeout"
+    except Exception:
+        logger.exception("advisor_failed")
+        reason = "error"
+    finally:
+        advisor_admission.release()
+    return _fallback(reason, question, location), reason
+
+async def stream_with_fallback(pool: AgentPool, prompt: str, question: str, location: str) -> AsyncIterator[str]:
+    """Stream the advisor's text, switching to the rule-based answer if the model fails before its first chunk.
+
+    A failure after text has been sent is raised as before, since the answer cannot be replaced.
+    """
+    if not advisor_admission.try_acquire():
+        yield f"{FALLBACK_NOTE}\n\n{_fallback('shed', question, location)}"
+        return
+
+    events = stream_agent_events("advisor", pool, prompt)
+    started = False
+    try:
+        async for event in events:
+            if "data" in event:
+                started = True
+                yield event["data"]
+        return
+    except CircuitOpen:
+        reason = "circuit_open"
+    except asyncio.TimeoutError:
+        reason = "timeout"
+    except Exception:
+        if started:
+            raise
+        logger.exception("advisor_failed")
+        reason = "error"
+    finally:
+        advisor_admission.release()
+        await events.aclose()
+    if started:
+        # Timed out mid-answer: end the stream with what was sent
+        return
+    yield f"{FALLBACK_NOTE}\n\n{_fallback(reason, question, location)}"
@@ -0,0 +1,65 @@
+import math
+import os
+import re
+from typing import List, Optional
+
+# Incidents of the same type within this window and area are treated as one cluster
+CLUSTER_WINDOW_SECONDS = float(os.environ.get("INCIDENT_CLUSTER_WINDOW_SECONDS", 900))
+
+# Grid cell size in degrees (~1 km at the equator); neighbouring cells are matched too
+CLUSTER_CELL_DEGREES = float(os.environ.get("INCIDENT_CLUSTER_CELL_DEGREES", 0.01))
+
+# Reports with coordinates join a cluster only if they are this close to its primary
+CLUSTER_RADIUS_METERS = float(os.environ.get("INCIDENT_CLUSTER_RADIUS_METERS", 500))
+
+# A place name with fewer words and no number (e.g. "Bangkok", "Sukhumvit Road") is too coarse to cluster on
+CLUSTER_MIN_PLACE_WORDS = int(os.environ.get("INCIDENT_CLUSTER_MIN_PLACE_WORDS", 3))
+
+EARTH_RADIUS_METERS = 6371000
+
+def normalize_location(location: str) -> str:
+    """Case, punctuation and whitespace-insensitive form of a free-text location"""
+    return " ".join(re.sub(r"[^\w\s]", " ", location.lower()).split())
+
+def is_specific_place(location: str) -> bool:
+    """Whether a free-text location is address-like enough that two reports there are one incident"""
+    words = normalize_location(location).split()
+    return any(char.isdigit() for char in location) or len(words) >= CLUSTER_MIN_PLACE_WORDS
+
+def distance_meters(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+    """Great-circle distance between two points"""
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(longitude2 - longitude1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
+
+def _cell(latitude: float, longitude: float):
+    return math.floor(latitude / CLUSTER_CELL_DEGREES), math.floor(longitude / CLUSTER_CELL_DEGREES)
+
+def cluster_key(incident_type: str, location: str, latitude: Optional[float] = None,
+                longitude: Optional[float] = None) -> str:
+    """Index key of the cell (coordinates) or normalized place name an incident belongs to"""
+    incident_type = incident_type.strip().lower()
+    if latitude is not None and longitude is not None:
+        row, column = _cell(latitude, longitude)
+        return f"{incident_type}|cell|{row}|{column}"
+    return f"{incident_type}|place|{normalize_location(location)}"
+
+def candidate_keys(incident_type: str, location: str, latitude: Optional[float] = None,
+                   longitude: Optional[float] = None) -> List[str]:
+    """Keys to search for a matching cluster: the incident's own key first, then adjacent cells.
+
+    Empty when the incident can't be placed precisely: no coordinates and only a coarse place name.
+    """
+    own = cluster_key(incident_type, location, latitude, longitude)
+    if latitude is None or longitude is None:
+        return [own] if is_specific_place(location) else []
+
+    incident_type = incident_type.strip().lower()
+    row, column = _cell(latitude, longitude)
+    neighbours = [
+        f"{incident_type}|cell|{row + dr}|{column + dc}"
+        for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc
+    ]
+    return [own] + neighbours
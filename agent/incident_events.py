@@ -0,0 +1,134 @@
+import asyncio
+import itertools
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+
+# Event types published by the coordinator
+INCIDENT_CREATED = "incident.created"
+INCIDENT_RESPONSE = "incident.response"
+INCIDENT_STATUS = "incident.status"
+# Sent first when missed events cannot be replayed; clients should refetch incident state
+STREAM_RESET = "stream.reset"
+
+class _Subscriber:
+    def __init__(self, incident_id: Optional[str], queue_size: int):
+        self.incident_id = incident_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def matches(self, event: Dict) -> bool:
+        return self.incident_id is None or event["incident_id"] == self.incident_id
+
+class IncidentEventBus:
+    """In-process pub/sub for incident events with a bounded replay history.
+
+    Every event gets a sequence number, so a client that reconnects with the last
+    sequence it saw gets the missed events replayed before live ones. The bus is
+    per worker process and must be used from the event loop: sequences and
+    history are not shared, so replay only works when a client reconnects to the
+    same worker (a single worker or sticky sessions). Event ids carry the bus's
+    epoch, so an id from another worker or from before a restart is recognised
+    and answered with a stream.reset event instead of the wrong events.
+    """
+
+    def __init__(self, history_size: int = 1000, subscriber_queue_size: int = 256):
+        # Identifies this bus's sequence numbers; new on every process start
+        self.epoch = uuid.uuid4().hex[:8]
+        self._sequence = itertools.count(1)
+        self._last_sequence = 0
+        self._history: deque = deque(maxlen=history_size)
+        self._subscribers: List[_Subscriber] = []
+        self.subscriber_queue_size = subscriber_queue_size
+
+    def event_id(self, event: Dict) -> str:
+        return f"{self.epoch}:{event['sequence']}"
+
+    def parse_event_id(self, event_id: str) -> Optional[int]:
+        """The sequence of an id issued by this bus, or None for an id this bus cannot resume from"""
+        epoch, _, sequence = event_id.partition(":")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def publish(self, event_type: str, incident_id: str, data: Dict) -> Dict:
+        """Record an event and hand it to every matching subscriber without waiting on them"""
+        self._last_sequence = next(self._sequence)
+        event = {
+            "sequence": self._last_sequence,
+            "type": event_type,
+            "incident_id": incident_id,
+            "timestamp": datetime.now().isoformat(),
+            "data": data
+        }
+        self._history.append(event)
+
+        for subscriber in list(self._subscribers):
+            if not subscriber.matches(event):
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer: end its stream; it resumes from its last sequence via replay.
+                # Undelivered events are all dropped so that sequence is the last one it received.
+                self._subscribers.remove(subscriber)
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(None)
+        return event
+
+    def replay(self, since: int, incident_id: Optional[str] = None) -> List[Dict]:
+        """Events after the given sequence that are still in the history"""
+        return [
+            event for event in self._history
+            if event["sequence"] > since and (incident_id is None or event["incident_id"] == incident_id)
+        ]
+
+    def _reset_event(self, incident_id: Optional[str], reason: str) -> Dict:
+        return {
+            "sequence": self._last_sequence,
+            "type": STREAM_RESET,
+            "incident_id": incident_id,
+            "timestamp": datetime.now().isoformat(),
+            "data": {"reason": reason}
+        }
+
+    async def subscribe(self, incident_id: Optional[str] = None, since: Optional[int] = None,
+                        reset: Optional[str] = None) -> AsyncIterator[Dict]:
+        """Yield events for one incident (or all), replaying history after `since` first.
+
+        Starts with a stream.reset event when the missed events cannot be
+        replayed: `reset` gives the caller's reason, and a `since` this bus never
+        issued or older than its history is reset too.
+        """
+        subscriber = _Subscriber(incident_id, self.subscriber_queue_size)
+        # Replay and registration happen without an await in between, so no event is missed or repeated
+        backlog = []
+        if since is not None and since > self._last_sequence:
+            reset = "unknown_stream"
+        elif since is not None and self._history and since < self._history[0]["sequence"] - 1:
+            reset = "history_gap"
+        elif since is not None:
+            backlog = self.replay(since, incident_id)
+        if reset:
+            backlog = [self._reset_event(incident_id, reset)]
+        self._subscribers.append(subscriber)
+
+        try:
+            for event in backlog:
+                yield event
+            while True:
+                event = await subscriber.queue.get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+# Global event bus shared by the coordinator and the SSE endpoints
+incident_event_bus = IncidentEventBus()
@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+from monitoring.tracing import request_id_var
+from storage.shared_state import StateBackend, StateBusy, InMemoryStateBackend, state_backend
+
+logger = logging.getLogger(__name__)
+
+# Namespace for background jobs in the state backend, so any worker can report on them
+JOBS = "jobs"
+
+# Jobs still waiting or running; they belong to the worker process that queued them
+ACTIVE_STATUSES = ("queued", "running")
+
+# Callbacks only go to the local machine, so a request can't make the server call arbitrary hosts
+DEFAULT_CALLBACK_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+class CallbackNotAllowed(ValueError):
+    """Raised when a callback URL points somewhere other than an allowed local host"""
+
+class JobManager:
+    """Runs long multi-agent work on background worker tasks and tracks each job in the state backend.
+
+    The queue lives in this process, so each active job records the worker that
+    owns it and a heartbeat the owner refreshes. A job whose heartbeat is older
+    than stale_seconds lost its worker (a restart or crash) and is marked failed
+    when it is polled or when any worker's janitor runs.
+    """
+
+    def __init__(self, state: Optional[StateBackend] = None, workers: int = 4, ttl_seconds: float = 3600,
+                 callback_hosts: Sequence[str] = DEFAULT_CALLBACK_HOSTS, heartbeat_seconds: float = 10.0,
+                 stale_seconds: float = 60.0):
+        self.state = state if state is not None else InMemoryStateBackend()
+        self.worker_count = workers
+        self.ttl_seconds = ttl_seconds
+        self.callback_hosts = set(callback_hosts)
+        self.heartbeat_seconds = heartbeat_seconds
+        self.stale_seconds = stale_seconds
+        # Unique per process start, so a restarted worker never claims its predecessor's jobs
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Active jobs of this worker, whose heartbeats it keeps fresh
+        self._owned = set()
+
+    def validate_callback_url(self, url: str) -> None:
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or parsed.hostname not in self.callback_hosts:
+            raise CallbackNotAllowed(f"Callback URL must be http(s) on one of: {', '.join(sorted(self.callback_hosts))}")
+
+    def start(self) -> None:
+        """Start the worker tasks, the heartbeat and the janitor; call from the running event loop"""
+        self.fail_orphaned()
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+        self._tasks.append(asyncio.create_task(self._janitor()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, job_id: str, run: Callable[[], Awaitable[Dict]], callback_url: Optional[str] = None,
+               **details) -> Dict:
+        """Record a queued job and hand it to the workers; run() produces the job's result"""
+        if self._queue is None:
+            raise RuntimeError("Job workers are not running")
+        if callback_url:
+            self.validate_callback_url(callback_url)
+
+        now = datetime.now().isoformat()
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "created_at": now,
+            "updated_at": now,
+            "worker": self.worker_id,
+            "heartbeat_at": time.time(),
+            "callback_url": callback_url,
+            **details
+        }
+        self.state.set(JOBS, job_id, job)
+        self._owned.add(job_id)
+        self._queue.put_nowait((job_id, run, request_id_var.get()))
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        job = self.state.get(JOBS, job_id)
+        if job is not None and self._is_orphaned(job):
+            job = self._fail_orphan(job_id)
+        return job
+
+    def _is_orphaned(self, job: Dict) -> bool:
+        return (
+            job["status"] in ACTIVE_STATUSES
+            and job["id"] not in self._owned
+            and job.get("heartbeat_at", 0) < time.time() - self.stale_seconds
+        )
+
+    def _fail_orphan(self, job_id: str) -> Optional[Dict]:
+        """Mark a job failed if it is still orphaned once the write lock is held"""
+        def fail(job: Dict) -> None:
+            if self._is_orphaned(job):
+                job.update(status="failed", error="worker lost", updated_at=datetime.now().isoformat())
+                logger.warning("job_orphaned", extra={"job_id": job_id, "worker": job.get("worker")})
+
+        return self.state.update(JOBS, job_id, fail)
+
+    def fail_orphaned(self) -> int:
+        """Mark failed every active job whose worker stopped sending heartbeats"""
+        orphaned = [job["id"] for job in self.state.values(JOBS) if self._is_orphaned(job)]
+        for job_id in orphaned:
+            self._fail_orphan(job_id)
+        return len(orphaned)
+
+    def _update(self, job_id: str, **changes) -> Optional[Dict]:
+        changes["updated_at"] = datetime.now().isoformat()
+        return self.state.update(JOBS, job_id, lambda job: job.update(changes))
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, run, request_id = await self._queue.get()
+            # Log lines from the job carry the id of the request that submitted it
+            token = request_id_var.set(request_id)
+            try:
+                await self._run(job_id, run)
+            except Exception:
+                logger.exception("job_worker_error", extra={"job_id": job_id})
+            finally:
+                request_id_var.reset(token)
+                self._owned.discard(job_id)
+                self._queue.task_done()
+
+    async def _run(self, job_id: str, run: Callable[[], Awaitable[Dict]]) -> None:
+        self._update(job_id, status="running")
+        start = time.perf_counter()
+        try:
+            job = self._update(job_id, status="completed", result=await run())
+        except Exception as e:
+            logger.exception("job_failed", extra={"job_id": job_id})
+            job = self._update(job_id, status="failed", error=str(e))
+        logger.info("job_finished", extra={
+            "job_id": job_id,
+            "status": job["status"],
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1)
+        })
+
+        if job.get("callback_url"):
+            self._update(job_id, callback_status=await self._send_callback(job))
+
+    async def _send_callback(self, job: Dict) -> str:
+        """POST the finished job to its callback URL; returns the HTTP status or the error"""
+        try:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+                async with session.post(job["callback_url"], json=job) as response:
+                    return str(response.status)
+        except Exception as e:
+            logger.warning("job_callback_failed", extra={"job_id": job["id"], "error": str(e)})
+            return f"error: {e}"
+
+    def prune_expired(self) -> int:
+        """Drop jobs of any status not updated or heartbeating for the TTL"""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [
+            job["id"] for job in self.state.values(JOBS)
+            if max(datetime.fromisoformat(job["updated_at"]).timestamp(), job.get("heartbeat_at", 0)) < cutoff
+        ]
+        for job_id in expired:
+            self.state.delete(JOBS, job_id)
+        return len(expired)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            now = time.time()
+            try:
+                for job_id in list(self._owned):
+                    self.state.update(JOBS, job_id, lambda job: job.update(heartbeat_at=now))
+            except StateBusy:
+                logger.warning("job_heartbeat_state_busy")
+
+    async def _janitor(self) -> None:
+        while True:
+            await asyncio.sleep(min(60.0, self.ttl_seconds))
+            try:
+                self.fail_orphaned()
+                self.prune_expired()
+            except StateBusy:
+                logger.warning("job_janitor_state_busy")
+
+    def stats(self) -> Tuple[int, int]:
+        """(queued in this worker, total tracked jobs)"""
+        return (self._queue.qsize() if self._queue else 0), self.state.count(JOBS)
+
+def parse_hosts(setting: str) -> List[str]:
+    return [host.strip() for host in setting.split(",") if host.strip()]
+
+# Global job manager; started and stopped by the application lifespan
+job_manager = JobManager(
+    state=state_backend,
+    workers=int(os.environ.get("JOB_WORKERS", 4)),
+    ttl_seconds=float(os.environ.get("JOB_TTL_SECONDS", 3600)),
+    callback_hosts=parse_hosts(os.environ.get("JOB_CALLBACK_HOSTS", ",".join(DEFAULT_CALLBACK_HOSTS))),
+    heartbeat_seconds=float(os.environ.get("JOB_HEARTBEAT_SECONDS", 10)),
+    stale_seconds=float(os.environ.get("JOB_STALE_SECONDS", 60))
+)
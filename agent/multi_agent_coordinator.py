@@ -1,20 +1,92 @@
 from strands import Agent, tool
 import json
+import os
 import asyncio
-from typing import Dict, List
+import logging
+import time
+from typing import Dict, List, Optional
 from datetime import datetime
 
+from agent.conversation import StatelessConversationManager
+from agent.earthquake_advisor import find_nearest_hospital, get_evacuation_centers
+from agent.incident_clustering import CLUSTER_RADIUS_METERS, CLUSTER_WINDOW_SECONDS, candidate_keys, distance_meters
+from agent.incident_events import (
+    INCIDENT_CREATED,
+    INCIDENT_RESPONSE,
+    INCIDENT_STATUS,
+    IncidentEventBus,
+    incident_event_bus,
+)
+from agent.agent_pool import AgentPool
+from agent.resilience import call_agent
+from agent.scheduler import PRIORITY_RANK, PriorityScheduler, agent_scheduler, normalize_priority
+from agent.tool_cache import memoize_tool
+from agent.tool_output import agent_output, agent_tool_output, compact_json, output_mode
+from monitoring import metrics
+from monitoring.instrumentation import instrument_tool
+from storage.incident_archive import IncidentArchive, incident_archive
+from storage.shared_state import StateBackend, StateBusy, InMemoryStateBackend, state_backend
+from storage.versioning import content_version
+
+logger = logging.getLogger(__name__)
+
+# Namespace for the hot incident set in the state backend; archived incidents go to cold storage
+INCIDENTS = "incidents"
+
+# Index of recent incident clusters by type and location cell, pointing at each cluster's primary
+INCIDENT_CLUSTERS = "incident_clusters"
+
+# How long a linked incident waits for its primary's coordination response before asking the agent itself
+CLUSTER_WAIT_SECONDS = 60
+
+incidents_clustered = metrics.registry.counter(
+    "incidents_clustered_total",
+    "New incidents by clustering outcome (primary, linked, escalated above the primary's severity, fallback)",
+    ("outcome",)
+)
+
+# Allowed lifecycle transitions; stabilizing incidents can flare up again
+STATUS_TRANSITIONS = {
+    "active": ("stabilizing", "resolved"),
+    "stabilizing": ("active", "resolved"),
+    "resolved": ("active", "archived"),
+    "archived": ()
+}
+
+# Responses kept per incident before older ones are compacted away
+MAX_RESPONSE_HISTORY = 20
+
+class InvalidTransition(ValueError):
+    """Raised when an incident cannot move to the requested status"""
+
+class UnknownStatus(ValueError):
+    """Raised for a status that is not part of the incident lifecycle"""
+
+def compact_responses(incident: Dict) -> None:
+    """Keep the initial coordination response and the latest response from each agent"""
+    responses = incident["responses"]
+    latest = {entry["agent"]: index for index, entry in enumerate(responses)}
+    keep = set(latest.values())
+    if responses and responses[0]["agent"] == "coordination":
+        keep.add(0)
+    incident["compacted_responses"] = incident.get("compacted_responses", 0) + len(responses) - len(keep)
+    incident["responses"] = [entry for i, entry in enumerate(responses) if i in keep]
+
 # Load community data
 def load_community_data():
     try:
-        with open("data/community_data.json", "r") as f:
+        with open(os.environ.get("COMMUNITY_DATA_FILE", "data/community_data.json"), "r") as f:
             return json.load(f)
     except FileNotFoundError:
         return {}
 
 COMMUNITY_DATA = load_community_data()
+COMMUNITY_DATA_VERSION = content_version(COMMUNITY_DATA)
 
+# Not memoized: the report is stamped with the current time
 @tool
+@instrument_tool
+@agent_output
 def coordinate_emergency_response(incident_type: str, location: str, severity: str) -> str:
     """
     Coordinate emergency response between multiple agents.
@@ -29,27 +101,40 @@ def coordinate_emergency_response(incident_type: str, location: str, severity: s
     """
     timestamp = datetime.now().strftime("%H:%M:%S")
     
+    if severity.lower() in ["high", "critical"]:
+        level = "critical"
+        actions = ["Fire & Rescue dispatched", "Medical teams en route", "Police for crowd control"]
+        if incident_type.lower() == "earthquake":
+            actions += ["Building safety inspectors notified", "Evacuation centers opening"]
+    else:
+        level = "standard"
+        actions = ["Local emergency teams dispatched", "Medical standby activated"]
+    
+    if output_mode() == "compact":
+        return compact_json({
+            "time": timestamp,
+            "location": location,
+            "incident": incident_type,
+            "severity": severity,
+            "response_level": level,
+            "actions": actions
+        })
+    
     response = f"🚨 EMERGENCY COORDINATION CENTER - {timestamp}\n"
     response += f"📍 Location: {location}\n"
     response += f"⚡ Incident: {incident_type.title()}\n"
     response += f"🔥 Severity: {severity.title()}\n\n"
-    
-    if severity.lower() in ["high", "critical"]:
-        response += "🔴 CRITICAL RESPONSE ACTIVATED\n"
-        response += "✅ Fire & Rescue dispatched\n"
-        response += "✅ Medical teams en route\n"
-        response += "✅ Police for crowd control\n"
-        if incident_type.lower() == "earthquake":
-            response += "✅ Building safety inspectors notified\n"
-            response += "✅ Evacuation centers opening\n"
-    else:
-        response += "🟡 STANDARD RESPONSE ACTIVATED\n"
-        response += "✅ Local emergency teams dispatched\n"
-        response += "✅ Medical standby activated\n"
+    response += "🔴 CRITICAL RESPONSE ACTIVATED\n" if level == "critical" else "🟡 STANDARD RESPONSE ACTIVATED\n"
+    for action in actions:
+        response += f"✅ {action}\n"
     
     return response
 
 @tool
+@instrument_tool
+@agent_output
+# The location is echoed back when it is unknown, so its casing is part of the key
+@memoize_tool(version=lambda: COMMUNITY_DATA_VERSION, exact=("location",))
 def get_resource_availability(location: str, resource_type: str) -> str:
     """
     Check availability of emergency resources in a location.
@@ -63,6 +148,24 @@ def get_resource_availability(location: str, resource_type: str) -> str:
     """
     location_lower = location.lower()
     
+    if output_mode() == "compact":
+        city = None
+        if "bangkok" in location_lower or "thailand" in location_lower:
+            city = "bangkok"
+        elif "yangon" in location_lower or "myanmar" in location_lower:
+            city = "yangon"
+        if city and resource_type.lower() == "medical":
+            hospitals = COMMUNITY_DATA.get("hospitals", {}).get(city, [])
+            return compact_json({"city": city, "resource": "medical", "hospitals": len(hospitals)})
+        elif city and resource_type.lower() == "evacuation":
+            centers = COMMUNITY_DATA.get("evacuation_centers", {}).get(city, [])
+            return compact_json({
+                "city": city,
+                "resource": "evacuation",
+                "centers": len(centers),
+                "total_capacity": sum(center.get("capacity", 0) for center in centers)
+            })
+    
     if "bangkok" in location_lower or "thailand" in location_lower:
         if resource_type.lower() == "medical":
             hospitals = COMMUNITY_DATA.get("hospitals", {}).get("bangkok", [])
@@ -83,32 +186,170 @@ def get_resource_availability(location: str, resource_type: str) -> str:
     
     return f"Resource information for {location} not available in current database."
 
-# Create specialized agents for different emergency roles
-medical_agent = Agent(
-    tools=[get_resource_availability]
-)
+# Tools of the specialized agents for different emergency roles; each call carries its incident's context
+ROLE_TOOLS = {
+    "medical": [get_resource_availability],
+    "evacuation": [get_resource_availability],
+    "coordination": [coordinate_emergency_response, get_resource_availability]
+}
 
-evacuation_agent = Agent(
-    tools=[get_resource_availability]
-)
+def create_role_agent(role: str) -> Agent:
+    # Retries are left to call_agent, which keeps them within the call's deadline
+    return Agent(tools=ROLE_TOOLS[role], conversation_manager=StatelessConversationManager(), retry_strategy=None)
 
-coordination_agent = Agent(
-    tools=[coordinate_emergency_response, get_resource_availability]
-)
+# Facts about an incident that tools would otherwise re-derive on every role's call
+INCIDENT_CONTEXT_FACTS = {
+    "coordination_plan": (
+        "Coordination plan",
+        lambda incident: coordinate_emergency_response(incident["type"], incident["location"], incident["severity"])
+    ),
+    "medical_resources": ("Medical resources", lambda incident: get_resource_availability(incident["location"], "medical")),
+    "evacuation_resources": (
+        "Evacuation resources", lambda incident: get_resource_availability(incident["location"], "evacuation")
+    ),
+    "nearest_hospitals": ("Nearest hospitals", lambda incident: find_nearest_hospital(incident["location"])),
+    "evacuation_centers": ("Evacuation centers", lambda incident: get_evacuation_centers(incident["location"]))
+}
+
+# Facts injected into each role's prompt
+ROLE_CONTEXT = {
+    "coordination": ("coordination_plan", "medical_resources", "evacuation_resources"),
+    "medical": ("medical_resources", "nearest_hospitals"),
+    "evacuation": ("evacuation_resources", "evacuation_centers")
+}
 
 class MultiAgentCoordinator:
     """Coordinates multiple specialized emergency response agents"""
     
-    def __init__(self):
-        self.agents = {
-            "medical": medical_agent,
-            "evacuation": evacuation_agent,
-            "coordination": coordination_agent
+    def __init__(self, state: Optional[StateBackend] = None, events: Optional[IncidentEventBus] = None,
+                 scheduler: Optional[PriorityScheduler] = None, archive: Optional[IncidentArchive] = None):
+        # Incidents live in the state backend so every worker sees the same set
+        self.state = state if state is not None else InMemoryStateBackend()
+        self.events = events if events is not None else IncidentEventBus()
+        # Orders agent calls by incident severity so critical incidents get model time first
+        self.scheduler = scheduler if scheduler is not None else PriorityScheduler()
+        # An agent serves one call at a time: each role can run as many calls as the scheduler
+        # admits, plus as many hedges of them
+        self.agent_pools = {
+            role: AgentPool(lambda role=role: create_role_agent(role), 2 * self.scheduler.max_concurrency)
+            for role in ROLE_TOOLS
         }
-        self.active_incidents = {}
+        # Archived incidents leave the state backend so the hot set (and process memory) stays bounded
+        self.archive = archive if archive is not None else incident_archive
+    
+    def _append_response(self, incident_id: str, agent: str, response, reused_from: Optional[str] = None) -> Optional[Dict]:
+        """Atomically record an agent response on a stored incident"""
+        entry = {
+            "agent": agent,
+            "response": str(response),
+            "timestamp": datetime.now().isoformat()
+        }
+        if reused_from:
+            entry["reused_from"] = reused_from
+        def append(incident: Dict) -> None:
+            incident["responses"].append(entry)
+            if len(incident["responses"]) > MAX_RESPONSE_HISTORY:
+                compact_responses(incident)
+
+        incident = self.state.update(INCIDENTS, incident_id, append)
+        if incident is not None:
+            self.events.publish(INCIDENT_RESPONSE, incident_id, entry)
+        return incident
+    
+    def _incident_context(self, incident: Dict, role: str) -> str:
+        """Prompt section with the facts a role needs, looked up once per incident and stored on it"""
+        context = incident.get("context", {})
+        # Facts go into an agent prompt, so they use the compact tool output and its token budget
+        with agent_tool_output():
+            missing = {
+                fact: INCIDENT_CONTEXT_FACTS[fact][1](incident)
+                for fact in ROLE_CONTEXT[role] if fact not in context
+            }
+        if missing:
+            self.state.update(INCIDENTS, incident["id"], lambda stored: stored.setdefault("context", {}).update(missing))
+            context = dict(context, **missing)
+        
+        sections = [f"[{INCIDENT_CONTEXT_FACTS[fact][0]}]\n{context[fact]}" for fact in ROLE_CONTEXT[role]]
+        return (
+            "\n\nIncident context, already looked up for this incident "
+            "(use it rather than calling tools for the same information):\n\n" + "\n\n".join(sections)
+        )
     
-    async def create_incident(self, incident_id: str, incident_type: str, location: str, severity: str) -> Dict:
-        """Create a new emergency incident"""
+    def _cluster_is_live(self, cluster: Dict, now: float) -> bool:
+        """A cluster accepts new members while its primary is recent, open and not failed"""
+        if now - cluster["created_at"] > CLUSTER_WINDOW_SECONDS:
+            return False
+        primary = self.state.get(INCIDENTS, cluster["primary"])
+        return (
+            primary is not None
+            and primary["status"] in ("active", "stabilizing")
+            and not primary.get("coordination_error")
+        )
+    
+    def _is_near_primary(self, cluster: Dict, latitude: Optional[float], longitude: Optional[float]) -> bool:
+        """Cells only narrow the search; reports with coordinates must also be within the radius"""
+        if latitude is None or longitude is None:
+            return True
+        primary = self.state.get(INCIDENTS, cluster["primary"]) or {}
+        if primary.get("latitude") is None or primary.get("longitude") is None:
+            return False
+        return distance_meters(latitude, longitude, primary["latitude"], primary["longitude"]) <= CLUSTER_RADIUS_METERS
+    
+    def _find_cluster(self, keys: List[str], now: float, latitude: Optional[float] = None,
+                      longitude: Optional[float] = None) -> Optional[str]:
+        """Primary incident id of a live cluster near the incident under any of the keys"""
+        for key in keys:
+            cluster = self.state.get(INCIDENT_CLUSTERS, key)
+            if cluster and self._cluster_is_live(cluster, now) and self._is_near_primary(cluster, latitude, longitude):
+                return cluster["primary"]
+        return None
+    
+    def _claim_cluster(self, key: str, incident_id: str, now: float, latitude: Optional[float] = None,
+                       longitude: Optional[float] = None) -> str:
+        """Make the incident primary of the cluster at key, unless another live primary nearby got there first"""
+        entry = {"key": key, "primary": incident_id, "created_at": now}
+        if self.state.add(INCIDENT_CLUSTERS, key, entry):
+            return incident_id
+        
+        winner = {"primary": incident_id}
+        
+        def claim(cluster: Dict) -> None:
+            if not self._cluster_is_live(cluster, now):
+                cluster.update(entry)
+            # A live primary in the same cell but outside the radius keeps the cell; this incident stands alone
+            if self._is_near_primary(cluster, latitude, longitude):
+                winner["primary"] = cluster["primary"]
+        
+        self.state.update(INCIDENT_CLUSTERS, key, claim)
+        return winner["primary"]
+    
+    def prune_clusters(self) -> int:
+        """Drop cluster index entries older than the clustering window"""
+        now = time.time()
+        expired = [
+            cluster["key"] for cluster in self.state.values(INCIDENT_CLUSTERS)
+            if now - cluster["created_at"] > CLUSTER_WINDOW_SECONDS
+        ]
+        for key in expired:
+            self.state.delete(INCIDENT_CLUSTERS, key)
+        return len(expired)
+    
+    async def _await_coordination(self, primary_id: str) -> Optional[Dict]:
+        """Wait for the primary's coordination response; None if it failed, vanished or took too long"""
+        deadline = time.monotonic() + CLUSTER_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            primary = self.state.get(INCIDENTS, primary_id)
+            if not primary or primary.get("coordination_error"):
+                return None
+            for entry in primary["responses"]:
+                if entry["agent"] == "coordination":
+                    return entry
+            await asyncio.sleep(0.1)
+        return None
+    
+    async def create_incident(self, incident_id: str, incident_type: str, location: str, severity: str,
+                              latitude: Optional[float] = None, longitude: Optional[float] = None) -> Dict:
+        """Create a new emergency incident, linking it to a matching recent one when possible"""
         incident = {
             "id": incident_id,
             "type": incident_type,
@@ -116,96 +357,216 @@ class MultiAgentCoordinator:
             "severity": severity,
             "timestamp": datetime.now().isoformat(),
             "status": "active",
+            "status_updated_at": datetime.now().isoformat(),
             "responses": []
         }
+        if latitude is not None and longitude is not None:
+            incident.update(latitude=latitude, longitude=longitude)
         
-        self.active_incidents[incident_id] = incident
+        # Match against recent incidents of the same type nearby, so a cluster gets one coordination call
+        now = time.time()
+        keys = candidate_keys(incident_type, location, latitude, longitude)
+        primary_id = self._find_cluster(keys, now, latitude, longitude)
+        if primary_id:
+            incident["primary_incident_id"] = primary_id
         
-        # Get initial coordination response
-        coordination_response = await self.agents["coordination"].ainvoke(
-            f"New {incident_type} incident at {location}, severity {severity}. Please coordinate initial response."
-        )
+        self.state.set(INCIDENTS, incident_id, incident)
         
-        incident["responses"].append({
-            "agent": "coordination",
-            "response": coordination_response,
-            "timestamp": datetime.now().isoformat()
-        })
+        if not keys:
+            # Too coarsely located to tell whether another report is the same incident
+            primary_id = incident_id
+        elif not primary_id:
+            primary_id = self._claim_cluster(keys[0], incident_id, now, latitude, longitude)
+            if primary_id != incident_id:
+                self.state.update(INCIDENTS, incident_id, lambda stored: stored.update(primary_incident_id=primary_id))
+                incident["primary_incident_id"] = primary_id
         
-        return incident
+        if primary_id != incident_id:
+            self.state.update(
+                INCIDENTS, primary_id, lambda primary: primary.setdefault("linked_incidents", []).append(incident_id)
+            )
+        
+        # A copy, since the in-memory backend keeps mutating the stored incident
+        self.events.publish(INCIDENT_CREATED, incident_id, dict(incident, responses=[]))
+        
+        if primary_id != incident_id:
+            primary = self.state.get(INCIDENTS, primary_id) or {}
+            # A more severe report than the primary gets its own coordination rather than a weaker plan
+            if PRIORITY_RANK[normalize_priority(severity)] <= PRIORITY_RANK[normalize_priority(primary.get("severity", ""))]:
+                entry = await self._await_coordination(primary_id)
+                if entry:
+                    incidents_clustered.inc("linked")
+                    return self._append_response(incident_id, "coordination", entry["response"], reused_from=primary_id)
+                incidents_clustered.inc("fallback")
+            else:
+                incidents_clustered.inc("escalated")
+        else:
+            incidents_clustered.inc("primary")
+        
+        # Get initial coordination response
+        try:
+            async with self.scheduler.slot(severity):
+                coordination_response = await call_agent(
+                    "coordination",
+                    self.agent_pools["coordination"],
+                    f"New {incident_type} incident at {location}, severity {severity}. Please coordinate initial response."
+                    + self._incident_context(incident, "coordination"),
+                    hedge=True
+                )
+        except Exception as e:
+            # Linked incidents waiting on this one fall back to their own call
+            self.state.update(INCIDENTS, incident_id, lambda stored: stored.update(coordination_error=str(e)))
+            raise
+        
+        return self._append_response(incident_id, "coordination", coordination_response)
     
     async def get_medical_response(self, incident_id: str) -> str:
         """Get medical team response for an incident"""
-        if incident_id not in self.active_incidents:
+        incident = self.state.get(INCIDENTS, incident_id)
+        if not incident:
             return "Incident not found"
         
-        incident = self.active_incidents[incident_id]
         location = incident["location"]
         
-        response = await self.agents["medical"].ainvoke(
-            f"Medical emergency response needed for {incident['type']} at {location}. "
-            f"Severity: {incident['severity']}. Provide medical resource allocation."
-        )
+        async with self.scheduler.slot(incident["severity"]):
+            response = await call_agent(
+                "medical",
+                self.agent_pools["medical"],
+                f"Medical emergency response needed for {incident['type']} at {location}. "
+                f"Severity: {incident['severity']}. Provide medical resource allocation."
+                + self._incident_context(incident, "medical"),
+                hedge=True
+            )
         
-        incident["responses"].append({
-            "agent": "medical",
-            "response": response,
-            "timestamp": datetime.now().isoformat()
-        })
+        self._append_response(incident_id, "medical", response)
         
         return response
     
     async def get_evacuation_response(self, incident_id: str) -> str:
         """Get evacuation team response for an incident"""
-        if incident_id not in self.active_incidents:
+        incident = self.state.get(INCIDENTS, incident_id)
+        if not incident:
             return "Incident not found"
         
-        incident = self.active_incidents[incident_id]
         location = incident["location"]
         
-        response = await self.agents["evacuation"].ainvoke(
-            f"Evacuation coordination needed for {incident['type']} at {location}. "
-            f"Severity: {incident['severity']}. Provide evacuation plan and resource status."
-        )
+        async with self.scheduler.slot(incident["severity"]):
+            response = await call_agent(
+                "evacuation",
+                self.agent_pools["evacuation"],
+                f"Evacuation coordination needed for {incident['type']} at {location}. "
+                f"Severity: {incident['severity']}. Provide evacuation plan and resource status."
+                + self._incident_context(incident, "evacuation"),
+                hedge=True
+            )
         
-        incident["responses"].append({
-            "agent": "evacuation",
-            "response": response,
-            "timestamp": datetime.now().isoformat()
-        })
+        self._append_response(incident_id, "evacuation", response)
         
         return response
     
     async def get_full_response(self, incident_id: str) -> Dict:
         """Get coordinated response from all agents"""
-        if incident_id not in self.active_incidents:
+        if not self.state.get(INCIDENTS, incident_id):
             return {"error": "Incident not found"}
         
         # Get responses from all specialized agents
         medical_response = await self.get_medical_response(incident_id)
         evacuation_response = await self.get_evacuation_response(incident_id)
         
-        incident = self.active_incidents[incident_id]
+        incident = self.state.get(INCIDENTS, incident_id)
         
+        # Plain text, like the stored responses, so the result can be saved and sent as JSON
         return {
             "incident": incident,
             "coordinated_response": {
-                "medical": medical_response,
-                "evacuation": evacuation_response,
+                "medical": str(medical_response),
+                "evacuation": str(evacuation_response),
                 "coordination": incident["responses"][0]["response"]  # Initial coordination response
             }
         }
     
     def get_incident_status(self, incident_id: str) -> Dict:
         """Get current status of an incident"""
-        if incident_id not in self.active_incidents:
+        incident = self.state.get(INCIDENTS, incident_id) or self.archive.get(incident_id)
+        if not incident:
             return {"error": "Incident not found"}
         
-        return self.active_incidents[incident_id]
+        return incident
+    
+    def update_incident_status(self, incident_id: str, status: str) -> Dict:
+        """Move an incident through its lifecycle; archiving moves it out of the hot set"""
+        if status not in STATUS_TRANSITIONS:
+            raise UnknownStatus(f"Unknown status: {status}")
+        
+        previous = {}
+        
+        def transition(incident: Dict) -> None:
+            if status not in STATUS_TRANSITIONS[incident["status"]]:
+                raise InvalidTransition(f"Cannot move incident from {incident['status']} to {status}")
+            previous["status"] = incident["status"]
+            incident["status"] = status
+            incident["status_updated_at"] = datetime.now().isoformat()
+            if status in ("resolved", "archived"):
+                compact_responses(incident)
+            if status == "archived":
+                # Looked-up facts only matter while agents are still working the incident
+                incident.pop("context", None)
+        
+        incident = self.state.update(INCIDENTS, incident_id, transition)
+        if incident is None:
+            if self.archive.get(incident_id):
+                raise InvalidTransition("Incident is archived")
+            return {"error": "Incident not found"}
+        
+        if status == "archived":
+            self.archive.put(incident)
+            self.state.delete(INCIDENTS, incident_id)
+        
+        self.events.publish(INCIDENT_STATUS, incident_id, {"from": previous["status"], "to": status})
+        return incident
+    
+    def archive_resolved_incidents(self, max_age_seconds: float) -> int:
+        """Archive incidents that have been resolved for longer than max_age_seconds"""
+        now = datetime.now()
+        archived = 0
+        for incident in self.state.values(INCIDENTS):
+            if incident["status"] != "resolved":
+                continue
+            resolved_at = datetime.fromisoformat(incident["status_updated_at"])
+            if (now - resolved_at).total_seconds() < max_age_seconds:
+                continue
+            try:
+                self.update_incident_status(incident["id"], "archived")
+                archived += 1
+            except InvalidTransition:
+                # Reopened or archived by another worker in the meantime
+                pass
+        return archived
+    
+    async def run_archiver(self, max_age_seconds: float, interval: float) -> None:
+        """Periodically archive resolved incidents and prune the cluster index until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.archive_resolved_incidents(max_age_seconds)
+                self.prune_clusters()
+            except StateBusy:
+                # Another worker holds the state lock; the next pass catches up
+                logger.warning("archiver_state_busy")
+    
+    def list_active_incidents(self, status: Optional[str] = None) -> List[Dict]:
+        """List all incidents that have not been archived, optionally only those with one status"""
+        if status is None:
+            return self.state.values(INCIDENTS)
+        if status not in STATUS_TRANSITIONS or status == "archived":
+            raise UnknownStatus(f"Unknown status: {status}")
+        return [incident for incident in self.state.values(INCIDENTS) if incident["status"] == status]
     
-    def list_active_incidents(self) -> List[Dict]:
-        """List all active incidents"""
-        return list(self.active_incidents.values())
+    def list_archived_incidents(self, limit: int = 50, offset: int = 0) -> List[Dict]:
+        """A page of archived incidents, most recently archived first"""
+        return self.archive.list(limit, offset)
 
 # Global coordinator instance
-multi_agent_coordinator = MultiAgentCoordinator() 
\ No newline at end of file
+multi_agent_coordinator = MultiAgentCoordinator(
+    state=state_backend, events=incident_event_bus, scheduler=agent_scheduler, archive=incident_archive
+) 
\ No newline at end of file
@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from agent.agent_pool import AgentPool
+from agent.circuit_breaker import CircuitBreaker, CircuitOpen, get_breaker
+from monitoring import metrics
+from monitoring.instrumentation import invoke_agent, stream_agent
+
+logger = logging.getLogger(__name__)
+
+# Total time allowed for one agent call, retries and hedges included (for streams: until the first chunk, then per chunk)
+AGENT_TIMEOUT_SECONDS = float(os.environ.get("AGENT_TIMEOUT_SECONDS", 30))
+
+# Retries of transient model errors, with full-jitter exponential backoff; agents are created with
+# retry_strategy=None so these are the only retries and they stay within the call's deadline
+AGENT_MAX_RETRIES = int(os.environ.get("AGENT_MAX_RETRIES", 2))
+AGENT_RETRY_BASE_SECONDS = float(os.environ.get("AGENT_RETRY_BASE_SECONDS", 0.25))
+AGENT_RETRY_MAX_SECONDS = float(os.environ.get("AGENT_RETRY_MAX_SECONDS", 4))
+
+# Hedged calls start a second attempt once the first has run longer than the role's recent p95
+AGENT_HEDGING = os.environ.get("AGENT_HEDGING", "on").lower() != "off"
+AGENT_HEDGE_MIN_SECONDS = float(os.environ.get("AGENT_HEDGE_MIN_SECONDS", 1))
+# Used until a role has enough recent calls to estimate its p95
+AGENT_HEDGE_DEFAULT_SECONDS = float(os.environ.get("AGENT_HEDGE_DEFAULT_SECONDS", 10))
+HEDGE_MIN_SAMPLES = 20
+
+# Model errors worth another attempt, by exception class name or AWS error code
+TRANSIENT_ERRORS = {
+    "ModelThrottledException",
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "ModelNotReadyException",
+    "ModelTimeoutException",
+    "EndpointConnectionError",
+    "ConnectTimeoutError",
+    "ReadTimeoutError"
+}
+
+# Errors raised on our side that say nothing about the backend's health (a busy Agent instance)
+LOCAL_ERRORS = {"ConcurrencyException"}
+
+agent_retries = metrics.registry.counter(
+    "agent_retries_total", "Agent calls retried after a transient error", ("role", "error")
+)
+agent_hedges = metrics.registry.counter(
+    "agent_hedges_total", "Hedged agent attempts: won or lost the race, or skipped with no free instance",
+    ("role", "outcome")
+)
+
+def error_name(error: BaseException) -> str:
+    """AWS error code for botocore client errors, otherwise the exception class name"""
+    code = getattr(error, "response", None)
+    if isinstance(code, dict):
+        code = code.get("Error", {}).get("Code")
+        if code:
+            return code
+    return type(error).__name__
+
+def is_transient(error: BaseException) -> bool:
+    return error_name(error) in TRANSIENT_ERRORS or isinstance(error, ConnectionError)
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number attempt (starting at 1)"""
+    return random.uniform(0, min(AGENT_RETRY_MAX_SECONDS, AGENT_RETRY_BASE_SECONDS * 2 ** (attempt - 1)))
+
+@contextmanager
+def cancel_after(seconds: float):
+    """Raise asyncio.TimeoutError if the block's awaits take longer than seconds.
+
+    Unlike wait_for, the block runs in the current task, so context variables
+    set by an async generator stay in the context that set them.
+    """
+    task = asyncio.current_task()
+    fired = []
+
+    def expire():
+        fired.append(True)
+        task.cancel()
+
+    handle = asyncio.get_running_loop().call_later(seconds, expire)
+    try:
+        yield
+    except asyncio.CancelledError:
+        if not fired:
+            raise
+        if hasattr(task, "uncancel"):
+            task.uncancel()
+        raise asyncio.TimeoutError() from None
+    finally:
+        handle.cancel()
+
+class LatencyTracker:
+    """Recent successful call durations per role, for choosing when to hedge"""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def observe(self, role: str, seconds: float) -> None:
+        self._samples.setdefault(role, deque(maxlen=self.window)).append(seconds)
+
+    def p95(self, role: str) -> Optional[float]:
+        samples = self._samples.get(role)
+        if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def hedge_delay(self, role: str) -> float:
+        p95 = self.p95(role)
+        return max(AGENT_HEDGE_MIN_SECONDS, p95 if p95 is not None else AGENT_HEDGE_DEFAULT_SECONDS)
+
+latency_tracker = LatencyTracker()
+
+def _record(breaker: CircuitBreaker, error: Optional[BaseException]) -> None:
+    if error is None:
+        breaker.record_success()
+    elif not isinstance(error, Exception) or error_name(error) in LOCAL_ERRORS:
+        breaker.record_cancelled()
+    else:
+        breaker.record_failure()
+
+async def _attempt(role: str, agent, prompt: str, breaker: CircuitBreaker):
+    start = time.monotonic()
+    try:
+        result = await invoke_agent(role, agent, prompt)
+    except BaseException as e:
+        _record(breaker, e)
+        raise
+    _record(breaker, None)
+    latency_tracker.observe(role, time.monotonic() - start)
+    return result
+
+async def _pooled_attempt(role: str, pool: AgentPool, prompt: str, breaker: CircuitBreaker):
+    async with pool.checkout() as agent:
+        return await _attempt(role, agent, prompt, breaker)
+
+async def _hedged_attempt(role: str, pool: AgentPool, prompt: str, breaker: CircuitBreaker):
+    """Run an attempt, starting the same call on a second instance if the first is slower than usual"""
+    primary = asyncio.ensure_future(_pooled_attempt(role, pool, prompt, breaker))
+    pending = {primary}
+    hedge_agent = None
+    try:
+        done, pending = await asyncio.wait(pending, timeout=latency_tracker.hedge_delay(role))
+        if done or not breaker.allow():
+            return await primary
+        # Never wait for an instance to hedge with; that would only add load where it is short
+        hedge_agent = pool.try_acquire()
+        if hedge_agent is None:
+            breaker.record_cancelled()
+            agent_hedges.inc(role, "skipped")
+            return await primary
+
+        hedge = asyncio.ensure_future(_attempt(role, hedge_agent, prompt, breaker))
+        pending = {primary, hedge}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    agent_hedges.inc(role, "won" if task is hedge else "lost")
+                    return task.result()
+        # Both failed; report the original attempt's error
+        return primary.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        if hedge_agent is not None:
+            if pending:
+                # Let the cancelled hedge unwind before its instance serves another call
+                await asyncio.wait(pending)
+            pool.release(hedge_agent)
+
+async def call_agent(role: str, pool: AgentPool, prompt: str, timeout: float = AGENT_TIMEOUT_SECONDS,
+                     hedge: bool = False):
+    """Invoke an agent from its pool with a deadline, retries of transient errors and its backend's circuit breaker.
+
+    Each attempt checks out its own instance. With hedge, a slow attempt is raced
+    against the same call on another free instance. Raises CircuitOpen without
+    calling the model while the backend's circuit is open, and
+    asyncio.TimeoutError once the deadline passes.
+    """
+    breaker = get_breaker(pool.backend)
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while True:
+        if not breaker.allow():
+            raise CircuitOpen(breaker.name)
+        try:
+            call = (
+                _hedged_attempt(role, pool, prompt, breaker)
+                if hedge and AGENT_HEDGING
+                else _pooled_attempt(role, pool, prompt, breaker)
+            )
+            return await asyncio.wait_for(call, max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            # The cancelled attempt was not counted; a backend this slow is failing
+            breaker.record_failure()
+            raise
+        except Exception as e:
+            attempt += 1
+            delay = backoff_delay(attempt)
+            if not is_transient(e) or attempt > AGENT_MAX_RETRIES or time.monotonic() + delay >= deadline:
+                raise
+            agent_retries.inc(role, error_name(e))
+            logger.warning("agent_retry", extra={"role": role, "attempt": attempt, "error": error_name(e)})
+            await asyncio.sleep(delay)
+
+async def stream_agent_events(role: str, pool: AgentPool, prompt: str,
+                              timeout: float = AGENT_TIMEOUT_SECONDS) -> AsyncIterator[dict]:
+    """Stream agent events with the same deadline, retries and circuit breaker as call_agent.
+
+    Each attempt holds its own instance until its stream ends. Transient errors
+    are retried only until the first text chunk; after that the stream cannot be
+    replayed, so errors are raised. Each later event must arrive within timeout seconds.
+    """
+    breaker = get_breaker(pool.backend)
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while True:
+        if not breaker.allow():
+            raise CircuitOpen(breaker.name)
+        try:
+            with cancel_after(max(0.0, deadline - time.monotonic())):
+                agent = await pool.acquire()
+        except BaseException:
+            breaker.record_cancelled()
+            raise
+        events = stream_agent(role, agent, prompt)
+        started = False
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                wait = timeout if started else max(0.0, deadline - time.monotonic())
+                try:
+                    with cancel_after(wait):
+                        event = await events.__anext__()
+                except StopAsyncIteration:
+                    break
+                started = started or "data" in event
+                yield event
+        except BaseException as e:
+            error = e
+            if started or not isinstance(e, Exception):
+                raise
+        finally:
+            _record(breaker, error)
+            await events.aclose()
+            pool.release(agent)
+
+        if error is None:
+            return
+        attempt += 1
+        delay = backoff_delay(attempt)
+        if not is_transient(error) or attempt > AGENT_MAX_RETRIES or time.monotonic() + delay >= deadline:
+            raise error
+        agent_retries.inc(role, error_name(error))
+        logger.warning("agent_retry", extra={"role": role, "attempt": attempt, "error": error_name(error)})
+        await asyncio.sleep(delay)
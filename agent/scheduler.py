@@ -0,0 +1,142 @@
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional, Tuple
+
+from monitoring import metrics
+
+# Severity levels from most to least urgent
+PRIORITIES = ("critical", "high", "medium", "low")
+PRIORITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+scheduler_wait = metrics.registry.histogram(
+    "agent_scheduler_wait_seconds", "Time agent calls waited for a slot by incident severity", ("severity",)
+)
+
+def normalize_priority(severity: str) -> str:
+    """Map a free-form severity onto a known priority; unknown values count as medium"""
+    severity = (severity or "").strip().lower()
+    return severity if severity in PRIORITY_RANK else "medium"
+
+def parse_quotas(setting: str) -> Dict[str, int]:
+    """Parse AGENT_PRIORITY_QUOTAS, e.g. "low=2,medium=4" """
+    quotas = {}
+    for item in filter(None, (part.strip() for part in setting.split(","))):
+        priority, _, limit = item.partition("=")
+        quotas[normalize_priority(priority)] = int(limit)
+    return quotas
+
+class _Waiter:
+    def __init__(self, priority: str, future: asyncio.Future):
+        self.priority = priority
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+class PriorityScheduler:
+    """Admits agent calls by severity and age, within a global concurrency limit and per-priority quotas.
+
+    A waiter's urgency is its rank plus one level per aging_seconds waited, so a
+    low-severity call is eventually served ahead of newer high-severity ones.
+    Ranking by rank * aging_seconds - enqueued_at gives the same order without
+    recomputing anything as time passes.
+    """
+
+    def __init__(self, max_concurrency: int = 8, aging_seconds: float = 30.0, quotas: Optional[Dict[str, int]] = None):
+        self.max_concurrency = max_concurrency
+        self.aging_seconds = aging_seconds
+        # Lower priorities may not fill all slots, so urgent work always finds room soon
+        self.quotas = {
+            "critical": max_concurrency,
+            "high": max_concurrency,
+            "medium": max(1, max_concurrency // 2),
+            "low": max(1, max_concurrency // 4)
+        }
+        self.quotas.update(quotas or {})
+        self.running: Dict[str, int] = {priority: 0 for priority in PRIORITIES}
+        self.queues: Dict[str, Deque[_Waiter]] = {priority: deque() for priority in PRIORITIES}
+
+    def _has_room(self, priority: str) -> bool:
+        return sum(self.running.values()) < self.max_concurrency and self.running[priority] < self.quotas[priority]
+
+    def _urgency(self, waiter: _Waiter) -> float:
+        return PRIORITY_RANK[waiter.priority] * self.aging_seconds - waiter.enqueued_at
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        """Most urgent queue head whose priority still has a free slot"""
+        best = None
+        for priority, queue in self.queues.items():
+            if queue and self._has_room(priority):
+                if best is None or self._urgency(queue[0]) > self._urgency(best):
+                    best = queue[0]
+        return best
+
+    def _dispatch(self) -> None:
+        while True:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self.queues[waiter.priority].popleft()
+            self.running[waiter.priority] += 1
+            scheduler_wait.observe(time.monotonic() - waiter.enqueued_at, waiter.priority)
+            waiter.future.set_result(None)
+
+    async def acquire(self, severity: str) -> str:
+        """Wait for a slot; returns the priority to pass to release()"""
+        priority = normalize_priority(severity)
+        if not any(self.queues.values()) and self._has_room(priority):
+            self.running[priority] += 1
+            scheduler_wait.observe(0.0, priority)
+            return priority
+
+        waiter = _Waiter(priority, asyncio.get_running_loop().create_future())
+        self.queues[priority].append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as the caller gave up: hand the slot on
+                self.release(priority)
+            else:
+                self.queues[priority].remove(waiter)
+            raise
+        return priority
+
+    def release(self, priority: str) -> None:
+        self.running[priority] -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, severity: str):
+        """Hold a scheduler slot for the duration of the block"""
+        priority = await self.acquire(severity)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def stats(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """(queued, running) counts per priority"""
+        return {priority: len(queue) for priority, queue in self.queues.items()}, dict(self.running)
+
+def create_agent_scheduler() -> PriorityScheduler:
+    """Scheduler configured from AGENT_MAX_CONCURRENCY, AGENT_PRIORITY_AGING_SECONDS and AGENT_PRIORITY_QUOTAS"""
+    return PriorityScheduler(
+        max_concurrency=int(os.environ.get("AGENT_MAX_CONCURRENCY", 8)),
+        aging_seconds=float(os.environ.get("AGENT_PRIORITY_AGING_SECONDS", 30)),
+        quotas=parse_quotas(os.environ.get("AGENT_PRIORITY_QUOTAS", ""))
+    )
+
+# Global scheduler for multi-agent work in this worker
+agent_scheduler = create_agent_scheduler()
+
+metrics.registry.gauge(
+    "agent_scheduler_queue_depth", "Agent calls waiting for a slot by incident severity",
+    lambda: {(priority,): depth for priority, depth in agent_scheduler.stats()[0].items()}, ("severity",)
+)
+metrics.registry.gauge(
+    "agent_scheduler_running", "Agent calls holding a slot by incident severity",
+    lambda: {(priority,): running for priority, running in agent_scheduler.stats()[1].items()}, ("severity",)
+)
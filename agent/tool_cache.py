@@ -0,0 +1,82 @@
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Sequence
+
+from agent.tool_output import output_mode
+from monitoring import metrics
+
+TOOL_CACHE_TTL_SECONDS = float(os.environ.get("TOOL_CACHE_TTL_SECONDS", 300))
+TOOL_CACHE_SIZE = int(os.environ.get("TOOL_CACHE_SIZE", 256))
+
+def normalize_argument(value):
+    """Case and whitespace-insensitive form of string arguments; other values are used as-is"""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    return value
+
+def memoize_tool(version: Callable[[], str], ttl: float = TOOL_CACHE_TTL_SECONDS, maxsize: int = TOOL_CACHE_SIZE,
+                 exact: Sequence[str] = ()):
+    """Cache a pure tool function's results by normalized arguments and data version.
+
+    Apply beneath @tool (and instrument_tool) so Strands still sees the original
+    signature. version() identifies the data snapshot the tool reads, so results
+    never outlive the data they were computed from; the output mode is part of the
+    key too. Arguments named in exact are keyed as given rather than normalized,
+    for tools that echo them in their output. Entries expire after ttl seconds and
+    the least recently used are evicted beyond maxsize.
+    """
+    def decorator(func: Callable) -> Callable:
+        name = func.__name__
+        signature = inspect.signature(func)
+        cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        lock = threading.Lock()
+        stats = {"hits": 0, "misses": 0}
+
+        def make_key(args, kwargs) -> tuple:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return (version(), output_mode()) + tuple(
+                value if name in exact else normalize_argument(value) for name, value in bound.arguments.items()
+            )
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            now = time.monotonic()
+
+            with lock:
+                entry = cache.get(key)
+                if entry is not None and entry[0] > now:
+                    cache.move_to_end(key)
+                    stats["hits"] += 1
+                    metrics.record_cache(f"tool:{name}", True)
+                    return entry[1]
+
+            result = func(*args, **kwargs)
+
+            with lock:
+                stats["misses"] += 1
+                cache[key] = (now + ttl, result)
+                cache.move_to_end(key)
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+            metrics.record_cache(f"tool:{name}", False)
+            return result
+
+        def cache_info() -> Dict:
+            with lock:
+                return dict(stats, size=len(cache), maxsize=maxsize, ttl=ttl)
+
+        def cache_clear() -> None:
+            with lock:
+                cache.clear()
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
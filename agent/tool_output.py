@@ -0,0 +1,154 @@
+import functools
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from agent.conversation import estimate_tokens
+from monitoring import metrics
+
+# Output mode for tools called by an agent: compact (short JSON) or text (the human rendering)
+TOOL_OUTPUT_MODE = os.environ.get("TOOL_OUTPUT_MODE", "compact").lower()
+
+# Estimated tokens of tool output allowed per agent request; later outputs are trimmed to fit
+TOOL_TOKEN_BUDGET = int(os.environ.get("TOOL_TOKEN_BUDGET", 2000))
+
+# Every tool output keeps at least this many tokens, even once the budget is spent
+MIN_TOOL_TOKENS = 64
+
+tool_output_tokens = metrics.registry.counter(
+    "tool_output_tokens_total", "Estimated tokens of tool output given to agents", ("tool",)
+)
+tool_outputs_trimmed = metrics.registry.counter(
+    "tool_outputs_trimmed_total", "Tool outputs trimmed to fit the request's token budget", ("tool",)
+)
+
+class TokenBudget:
+    """Estimated token usage of one agent request: its prompt plus the tool output it receives"""
+
+    def __init__(self, prompt: str = "", budget: int = TOOL_TOKEN_BUDGET):
+        self.prompt_tokens = estimate_tokens(prompt) if prompt else 0
+        self.tool_tokens = 0
+        self.budget = budget
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.budget - self.tool_tokens)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.tool_tokens
+
+    def charge(self, tokens: int) -> None:
+        # Tools may run concurrently on worker threads
+        with self._lock:
+            self.tool_tokens += tokens
+
+_request_budget: ContextVar[Optional[TokenBudget]] = ContextVar("tool_token_budget", default=None)
+
+@contextmanager
+def agent_tool_output(prompt: str = "", budget: int = TOOL_TOKEN_BUDGET):
+    """Mark tool calls in this block as agent consumption: compact output within a token budget"""
+    request_budget = TokenBudget(prompt, budget)
+    token = _request_budget.set(request_budget)
+    try:
+        yield request_budget
+    finally:
+        _request_budget.reset(token)
+
+def output_mode() -> str:
+    """compact inside agent_tool_output (unless TOOL_OUTPUT_MODE=text), otherwise text"""
+    return TOOL_OUTPUT_MODE if _request_budget.get() is not None else "text"
+
+def compact_json(data: Dict) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+def _clean(line: str) -> str:
+    # Drop leading emoji, bullets and other decoration
+    return re.sub(r"^[^\w(\"']+", "", line).strip()
+
+def compact_guidance(text: str) -> str:
+    """Compact JSON of an advice text: title, do/avoid lists from its ✅/❌ lines, headed sections and notes"""
+    guidance = {"title": None, "do": [], "avoid": [], "sections": {}, "notes": []}
+    section = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if guidance["title"] is None:
+            guidance["title"] = _clean(line).rstrip(":")
+        elif line.endswith(":"):
+            section = guidance["sections"].setdefault(_clean(line).rstrip(":"), [])
+        elif section is not None and line[0] in "✅❌•":
+            section.append(_clean(line))
+        elif line.startswith("✅"):
+            guidance["do"].append(_clean(line))
+        elif line.startswith("❌"):
+            guidance["avoid"].append(_clean(line))
+        else:
+            section = None
+            guidance["notes"].append(_clean(line))
+    return compact_json({key: value for key, value in guidance.items() if value})
+
+def trim_to_tokens(text: str, limit: int) -> str:
+    """Fit text into about limit tokens, dropping trailing items of the largest list in JSON output"""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+
+    if isinstance(data, dict):
+        lists = [key for key, value in data.items() if isinstance(value, list) and value]
+        if lists:
+            key = max(lists, key=lambda name: len(data[name]))
+            items = data[key]
+            # Largest number of items that still fits, by binary search
+            low, high = 0, len(items)
+            while low < high:
+                middle = (low + high + 1) // 2
+                candidate = dict(data, **{key: items[:middle], "omitted": len(items) - middle})
+                if estimate_tokens(compact_json(candidate)) <= limit:
+                    low = middle
+                else:
+                    high = middle - 1
+            text = compact_json(dict(data, **{key: items[:low], "omitted": len(items) - low}))
+            if estimate_tokens(text) <= limit:
+                return text
+
+    marker = " ...[trimmed to fit token budget]"
+    return text[:max(0, limit * 4 - len(marker))] + marker
+
+def agent_output(func: Callable) -> Callable:
+    """Adapt a tool's result for agent requests: compact form, trimmed to the request's token budget.
+
+    Apply beneath instrument_tool and above memoize_tool, so cached results are
+    trimmed per request. Tools with data to report return compact JSON themselves
+    when output_mode() is compact; multi-line advice text is converted here.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+        budget = _request_budget.get()
+        if budget is None:
+            return result
+
+        if TOOL_OUTPUT_MODE == "compact" and "\n" in result and not result.startswith("{"):
+            result = compact_guidance(result)
+
+        limit = max(budget.remaining, MIN_TOOL_TOKENS)
+        if estimate_tokens(result) > limit:
+            result = trim_to_tokens(result, limit)
+            tool_outputs_trimmed.inc(name)
+
+        tokens = estimate_tokens(result)
+        budget.charge(tokens)
+        tool_output_tokens.inc(name, amount=tokens)
+        return result
+
+    return wrapper
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+from agent.answer_cache import AnswerCache, TieredAnswerCache, answer_key
+
+logger = logging.getLogger(__name__)
+
+# How warm-up runs: agent (cache the model's answers), local (run the rule-based path to warm tools and data,
+# caching nothing) or off
+WARMUP_MODE = os.environ.get("WARMUP_MODE", "agent").lower()
+WARMUP_QUESTIONS_FILE = os.environ.get("WARMUP_QUESTIONS_FILE", "data/warmup_questions.json")
+# Questions answered at once; in agent mode each takes one of the advisor's MAX_INFLIGHT_AGENT_CALLS instances
+WARMUP_CONCURRENCY = int(os.environ.get("WARMUP_CONCURRENCY", 1))
+
+def load_warmup_questions(path: str = WARMUP_QUESTIONS_FILE) -> Dict[str, List[str]]:
+    """Top questions per location, e.g. {"bangkok": ["Where is the nearest hospital?"]}"""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.warning("warmup_questions_missing", extra={"path": path})
+        return {}
+
+class WarmupState:
+    """Progress of this worker's warm-up; the worker reports ready once it has finished or failed"""
+
+    def __init__(self):
+        self.status = "pending"
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.duration_seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "skipped", "failed")
+
+    def as_dict(self) -> Dict:
+        return {
+            "status": self.status,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "duration_seconds": self.duration_seconds
+        }
+
+async def warm_answer_cache(cache: Union[AnswerCache, TieredAnswerCache], version: str, questions: Dict[str, List[str]],
+                            answer: Callable[[str, str], Awaitable[Optional[str]]], state: WarmupState,
+                            concurrency: int = WARMUP_CONCURRENCY) -> None:
+    """Answer each (location, question) not already cached and store the answer unless it is None, then mark state ready.
+
+    A question that fails is logged and skipped: the degraded mode still answers
+    it, so a model outage must not keep the worker out of rotation.
+    """
+    pending = [
+        (location, question)
+        for location, location_questions in questions.items()
+        for question in location_questions
+        if answer_key(version, question, location) not in cache
+    ]
+    state.status = "running"
+    state.total = len(pending)
+    start = time.monotonic()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def warm(location: str, question: str) -> None:
+        async with semaphore:
+            # Another worker sharing the cache may have answered it while this one waited
+            if answer_key(version, question, location) in cache:
+                state.completed += 1
+                return
+            try:
+                result = await answer(question, location)
+                if result is not None:
+                    cache.set(answer_key(version, question, location), result)
+                state.completed += 1
+            except Exception:
+                state.failed += 1
+                logger.warning("warmup_question_failed", exc_info=True, extra={"location": location})
+
+    await asyncio.gather(*(warm(location, question) for location, question in pending))
+    state.duration_seconds = round(time.monotonic() - start, 3)
+    state.status = "ready"
+    logger.info("warmup_finished", extra=state.as_dict())
+
+# Global warm-up progress of this worker, reported by /ready
+warmup_state = WarmupState()
@@ -0,0 +1,115 @@
+"""
+HTTP client for the Disaster Ready API, shared by the Streamlit frontends
+"""
+
+import asyncio
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# API base URL - set API_BASE_URL for your deployment
+API_BASE = os.environ.get("API_BASE_URL", "http://localhost:8000")
+
+# (connect, read) timeouts in seconds; agent answers can take a while to generate
+DEFAULT_TIMEOUT = (3.05, 60)
+
+# A call for APIClient.gather: (method, path, json body or None)
+APICall = Tuple[str, str, Optional[Dict]]
+
+class APIClient:
+    """Keep-alive connection pool with timeouts and retries for the backend API"""
+
+    def __init__(self, base_url: str = API_BASE, timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 retries: int = 2, pool_size: int = 10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.pool_size = pool_size
+
+        # Connection failures are retried for every method; 5xx retries only for idempotent GETs
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            backoff_factor=0.3,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Concurrent calls run on one background event loop with one aiohttp session, so their
+        # connections are reused across gather() calls; both are created on first use
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_session: Optional[aiohttp.ClientSession] = None
+        self._loop_lock = threading.Lock()
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(f"{self.base_url}{path}", **kwargs)
+
+    def post(self, path: str, json: Optional[Dict] = None, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(f"{self.base_url}{path}", json=json, **kwargs)
+
+    def gather(self, calls: List[APICall]) -> List[Optional[Dict]]:
+        """Issue independent calls concurrently; returns parsed JSON per call, or None on failure"""
+        if not calls:
+            return []
+        return asyncio.run_coroutine_threadsafe(self._gather_async(calls), self._event_loop()).result()
+
+    def close(self) -> None:
+        self.session.close()
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            if self._async_session is not None:
+                asyncio.run_coroutine_threadsafe(self._async_session.close(), loop).result()
+                self._async_session = None
+            loop.call_soon_threadsafe(loop.stop)
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="api-client", daemon=True).start()
+            return self._loop
+
+    async def _gather_async(self, calls: List[APICall]) -> List[Optional[Dict]]:
+        # Only ever touched on the client's own loop, so no lock is needed
+        if self._async_session is None:
+            connect_timeout, read_timeout = self.timeout
+            self._async_session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(connect=connect_timeout, sock_read=read_timeout),
+                connector=aiohttp.TCPConnector(limit=self.pool_size)
+            )
+        return await asyncio.gather(*(self._call_async(self._async_session, *call) for call in calls))
+
+    async def _call_async(self, session: aiohttp.ClientSession, method: str, path: str,
+                          body: Optional[Dict]) -> Optional[Dict]:
+        for attempt in range(self.retries + 1):
+            try:
+                async with session.request(method, f"{self.base_url}{path}", json=body) as response:
+                    if response.status != 200:
+                        return None
+                    return await response.json()
+            except aiohttp.ClientConnectionError as e:
+                # A POST may have reached the server unless the connection was never established,
+                # and repeating it could submit a choice or an incident twice
+                if method != "GET" and not isinstance(e, aiohttp.ClientConnectorError):
+                    return None
+                if attempt == self.retries:
+                    return None
+                await asyncio.sleep(0.3 * (2 ** attempt))
+            except asyncio.TimeoutError:
+                return None
@@ -1,8 +1,10 @@
 import streamlit as st
-import requests
 import json
+import uuid
 from datetime import datetime
 
+from api_client import APIClient
+
 # Page configuration
 st.set_page_config(
     page_title="Disaster Ready: Earthquake Response Simulator",
@@ -10,14 +12,20 @@ st.set_page_config(
     layout="wide"
 )
 
-# API base URL
-API_BASE = "http://localhost:8000"
+@st.cache_resource
+def get_api_client() -> APIClient:
+    """One pooled API client shared by every session and rerun"""
+    return APIClient()
+
+api = get_api_client()
 
 def init_session_state():
     if 'chat_history' not in st.session_state:
         st.session_state.chat_history = []
     if 'user_location' not in st.session_state:
         st.session_state.user_location = "general"
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
 
 def main():
     init_session_state()
@@ -42,11 +50,12 @@ def main():
         
         if st.button("Ask") and user_question:
             try:
-                response = requests.post(f"{API_BASE}/ask/direct",
-                                       json={
-                                           "question": user_question,
-                                           "location": location
-                                       })
+                response = api.post("/ask/direct",
+                                  json={
+                                      "question": user_question,
+                                      "location": location,
+                                      "session_id": st.session_state.session_id
+                                  })
                 
                 if response.status_code == 200:
                     result = response.json()
@@ -63,8 +72,8 @@ def main():
         
         if st.button("Start Random Scenario"):
             try:
-                response = requests.post(f"{API_BASE}/scenario/start",
-                                       json={"random": True})
+                response = api.post("/scenario/start",
+                                  json={"random": True, "session_id": st.session_state.session_id})
                 if response.status_code == 200:
                     scenario = response.json()
                     st.write("**Scenario:**", scenario["scenario"]["title"])
@@ -72,8 +81,8 @@ def main():
                     
                     for choice in scenario["choices"]:
                         if st.button(choice["text"], key=choice["id"]):
-                            choice_response = requests.post(f"{API_BASE}/scenario/choice",
-                                                          json={"choice_id": choice["id"]})
+                            choice_response = api.post("/scenario/choice",
+                                                     json={"choice_id": choice["id"], "session_id": st.session_state.session_id})
                             if choice_response.status_code == 200:
                                 result = choice_response.json()
                                 st.write(result)
@@ -85,7 +94,7 @@ def main():
         st.header("Learn Earthquake Safety")
         
         try:
-            response = requests.get(f"{API_BASE}/learn/basics")
+            response = api.get("/learn/basics")
             if response.status_code == 200:
                 basics = response.json()
                 
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmarks for the FastAPI service
+
+Drives main.app in-process over the httpx ASGI transport and/or over real
+sockets through uvicorn, with the Strands agents replaced by an offline
+stand-in. Reports throughput and p50/p95/p99 per workload and can save or
+compare against baselines in benchmarks/baselines/.
+
+Usage:
+    python -m benchmarks.e2e --transport both --iterations 500 --concurrency 16
+    python -m benchmarks.e2e --save-baseline
+    python -m benchmarks.e2e --compare --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import socket
+import sys
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+import uvicorn
+
+import main
+from benchmarks.offline_model import install_offline_agents
+from benchmarks.reporting import find_regressions, format_table, load_baseline, save_baseline, summarize
+
+def check(response: httpx.Response) -> httpx.Response:
+    if response.status_code >= 400:
+        raise RuntimeError(f"{response.request.method} {response.request.url.path} -> {response.status_code}: {response.text}")
+    return response
+
+async def scenarios_list(client: httpx.AsyncClient, i: int):
+    check(await client.get("/scenarios"))
+
+async def scenario_flow(client: httpx.AsyncClient, i: int):
+    session_id = f"bench-{i}"
+    check(await client.post("/scenario/start", json={"scenario_id": "home_night", "session_id": session_id}))
+    check(await client.post("/scenario/choice", json={"choice_id": "stay_bed", "session_id": session_id}))
+    check(await client.post("/scenario/choice", json={"choice_id": "check_injuries", "session_id": session_id}))
+
+async def learn(client: httpx.AsyncClient, i: int):
+    check(await client.get("/learn/basics"))
+    check(await client.get("/learn/southeast-asia"))
+
+async def ask_direct(client: httpx.AsyncClient, i: int):
+    # A question never asked before, so every request misses the answer cache and goes to the model
+    question = f"What should I do while driving? ({uuid.uuid4().hex[:8]})"
+    check(await client.post("/ask/direct", json={"question": question, "location": "bangkok"}))
+
+async def ask_direct_cached(client: httpx.AsyncClient, i: int):
+    check(await client.post("/ask/direct", json={"question": "What should I do while driving?", "location": "bangkok"}))
+
+async def ask_stream(client: httpx.AsyncClient, i: int):
+    async with client.stream("POST", "/ask", json={"question": "What should I do at night?", "location": "yangon"}) as response:
+        check(response)
+        async for _ in response.aiter_bytes():
+            pass
+
+async def multi_agent(client: httpx.AsyncClient, i: int):
+    created = check(await client.post(
+        "/multi-agent/incident",
+        json={"incident_type": "earthquake", "location": "Bangkok", "severity": "high"}
+    )).json()
+    incident_id = created["incident_id"]
+    check(await client.post(f"/multi-agent/incident/{incident_id}/response"))
+    check(await client.get(f"/multi-agent/incident/{incident_id}"))
+    check(await client.get("/multi-agent/incidents"))
+
+WORKLOADS: Dict[str, Callable[[httpx.AsyncClient, int], Awaitable[None]]] = {
+    "scenarios": scenarios_list,
+    "scenario_flow": scenario_flow,
+    "learn": learn,
+    "ask_direct": ask_direct,
+    "ask_direct_cached": ask_direct_cached,
+    "ask_stream": ask_stream,
+    "multi_agent": multi_agent
+}
+
+async def run_workload(client: httpx.AsyncClient, workload, iterations: int, concurrency: int, warmup: int) -> Dict:
+    """Run one workload with a fixed number of concurrent workers and collect per-iteration latency"""
+    for i in range(warmup):
+        await workload(client, -1 - i)
+
+    latencies = []
+    pending = iter(range(iterations))
+
+    async def worker():
+        for i in pending:
+            start = time.perf_counter()
+            await workload(client, i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start)
+
+async def run_suite(client: httpx.AsyncClient, workloads: List[str], iterations: int, concurrency: int,
+                    warmup: int) -> Dict[str, Dict]:
+    results = {}
+    for name in workloads:
+        results[name] = await run_workload(client, WORKLOADS[name], iterations, concurrency, warmup)
+    return results
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(port: int) -> uvicorn.Server:
+    """Serve main.app from a background thread so the benchmark talks to it over TCP"""
+    config = uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("uvicorn did not start within 10 seconds")
+        time.sleep(0.05)
+    return server
+
+async def benchmark_transport(transport: str, args) -> Dict[str, Dict]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    if transport == "asgi":
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench",
+                                     limits=limits) as client:
+            return await run_suite(client, args.workloads, args.iterations, args.concurrency, args.warmup)
+
+    port = free_port()
+    server = start_server(port)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            return await run_suite(client, args.workloads, args.iterations, args.concurrency, args.warmup)
+    finally:
+        server.should_exit = True
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end benchmarks for the Disaster Ready API")
+    parser.add_argument("--transport", choices=["asgi", "socket", "both"], default="asgi")
+    parser.add_argument("--workloads", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--iterations", type=int, default=200, help="measured iterations per workload")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients per workload")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured iterations before each workload")
+    parser.add_argument("--model-latency", type=float, default=0.0,
+                        help="simulated seconds per agent call in the offline model")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="fail if results regress against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed relative regression in p95 latency or throughput")
+    return parser.parse_args(argv)
+
+def main_cli(argv=None) -> int:
+    args = parse_args(argv)
+    install_offline_agents(latency=args.model_latency)
+
+    transports = ["asgi", "socket"] if args.transport == "both" else [args.transport]
+    regressions = []
+
+    for transport in transports:
+        results = asyncio.run(benchmark_transport(transport, args))
+        baseline_name = f"e2e-{transport}"
+
+        print(f"\n🚀 {transport.upper()} transport ({args.iterations} iterations, concurrency {args.concurrency})")
+        print(format_table(results, ["count", "throughput", "p50_ms", "p95_ms", "p99_ms", "max_ms"]))
+
+        if args.compare:
+            baseline = load_baseline(baseline_name)
+            if not baseline:
+                print(f"⚠️ No baseline saved for {baseline_name}")
+            regressions.extend(f"[{transport}] {line}" for line in find_regressions(results, baseline, args.threshold))
+
+        if args.save_baseline:
+            print(f"💾 Baseline saved to {save_baseline(baseline_name, results)}")
+
+    if regressions:
+        print("\n❌ Regressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
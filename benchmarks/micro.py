@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for ScenarioEngine and the advisor @tool functions
+
+Each benchmark is parametrized over data size: scenario catalog size for the
+engine, choices per scenario for _find_choice and facilities per city for the
+tools. Results are reported pytest-benchmark style, followed by a scaling
+table per benchmark with the fitted growth exponent, so paths that are linear
+in data size stand out.
+
+Usage:
+    python -m benchmarks.micro
+    python -m benchmarks.micro --sizes 10 1000 100000 --only tool
+    python -m benchmarks.micro --save-baseline
+    python -m benchmarks.micro --compare --threshold 0.3
+"""
+
+import argparse
+import inspect
+import json
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import agent.earthquake_advisor as advisor
+from benchmarks.reporting import format_table, load_baseline, save_baseline
+from benchmarks.synthetic import make_community_data, make_scenario_catalog
+from simulation.scenario_engine import ScenarioEngine
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+
+# Minimum wall time for one timed round; fast calls are looped inside a round
+MIN_ROUND_TIME = 0.0001
+
+def bench(func: Callable, setup: Optional[Callable[[], Tuple]] = None, min_rounds: int = 5,
+          max_time: float = 0.25, max_rounds: int = 10000) -> Dict:
+    """Time func like pytest-benchmark; setup runs untimed before each round and supplies func's args"""
+    iterations = 1
+    if setup is None:
+        start = time.perf_counter()
+        func()
+        single = time.perf_counter() - start
+        iterations = max(1, int(MIN_ROUND_TIME / single)) if single > 0 else 1000
+
+    timings = []
+    deadline = time.perf_counter() + max_time
+    while len(timings) < max_rounds and (len(timings) < min_rounds or time.perf_counter() < deadline):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func(*args)
+        timings.append((time.perf_counter() - start) / iterations)
+
+    timings.sort()
+    quartiles = statistics.quantiles(timings, n=4) if len(timings) > 1 else [timings[0]] * 3
+    median = statistics.median(timings)
+    return {
+        "min_us": timings[0] * 1e6,
+        "max_us": timings[-1] * 1e6,
+        "mean_us": statistics.fmean(timings) * 1e6,
+        "stddev_us": (statistics.stdev(timings) if len(timings) > 1 else 0.0) * 1e6,
+        "median_us": median * 1e6,
+        "iqr_us": (quartiles[2] - quartiles[0]) * 1e6,
+        "ops": 1 / median if median > 0 else 0.0,
+        "rounds": len(timings)
+    }
+
+def build_engine(catalog: Dict) -> ScenarioEngine:
+    """Load a catalog through the normal file path so load-time precomputation is included"""
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(catalog, f)
+        path = f.name
+    try:
+        return ScenarioEngine(scenarios_file=path)
+    finally:
+        os.remove(path)
+
+def select(cases: Dict[str, Callable[[], Dict]], only: Optional[str]) -> Dict[str, Callable[[], Dict]]:
+    """Benchmarks whose name contains only (all of them if it is empty)"""
+    return {name: run for name, run in cases.items() if not only or only in name}
+
+def engine_benchmarks(size: int, only: Optional[str] = None) -> Dict[str, Dict]:
+    # Filled in only if a benchmark is selected, since large catalogs are slow to build
+    data = {}
+
+    def start():
+        data["engine"].start_scenario(data["last"]["id"], "bench")
+
+    def submit():
+        data["engine"].submit_choice(data["first_choice"], "bench")
+
+    def find_choice():
+        data["engine"]._find_choice(data["wide"], data["last_choice"])
+
+    cases = select({
+        "ScenarioEngine.start_scenario": lambda: bench(start),
+        "ScenarioEngine.submit_choice": lambda: bench(submit, setup=lambda: start() or ()),
+        "ScenarioEngine.get_available_scenarios": lambda: bench(data["engine"].get_available_scenarios, max_rounds=50),
+        "ScenarioEngine._find_choice": lambda: bench(find_choice)
+    }, only)
+    if not cases:
+        return {}
+
+    data["engine"] = build_engine(make_scenario_catalog(size))
+    # The last scenario is the worst case for any scan of the catalog
+    data["last"] = data["engine"].scenarios["scenarios"][-1]
+    data["first_choice"] = data["last"]["choices"][0]["id"]
+    # _find_choice scales with choices per scenario rather than catalog size
+    data["wide"] = make_scenario_catalog(1, choices_per_scenario=size)["scenarios"][0]
+    data["last_choice"] = data["wide"]["follow_up_choices"][-1]["id"]
+
+    return {name: run() for name, run in cases.items()}
+
+def tool_benchmarks(size: int, only: Optional[str] = None) -> Dict[str, Dict]:
+    # Tool bodies are unwrapped past the memoization layer so their own scaling is measured
+    calls = {
+        "tool.get_emergency_contacts": lambda: inspect.unwrap(advisor.get_emergency_contacts)("bangkok"),
+        "tool.get_earthquake_safety_advice": lambda: inspect.unwrap(advisor.get_earthquake_safety_advice)("driving on the highway"),
+        "tool.find_nearest_hospital": lambda: inspect.unwrap(advisor.find_nearest_hospital)("bangkok"),
+        "tool.get_evacuation_centers": lambda: inspect.unwrap(advisor.get_evacuation_centers)("yangon"),
+        "tool.check_building_safety": lambda: inspect.unwrap(advisor.check_building_safety)("cracks in the wall"),
+        "tool.find_nearest_hospital (memoized)": lambda: advisor.find_nearest_hospital("bangkok")
+    }
+    cases = select({name: (lambda call=call: bench(call, max_rounds=200)) for name, call in calls.items()}, only)
+    if not cases:
+        return {}
+
+    original = advisor.COMMUNITY_DATA, advisor.COMMUNITY_DATA_VERSION
+    advisor.COMMUNITY_DATA = make_community_data(size)
+    advisor.COMMUNITY_DATA_VERSION = f"synthetic-{size}"
+    try:
+        return {name: run() for name, run in cases.items()}
+    finally:
+        advisor.COMMUNITY_DATA, advisor.COMMUNITY_DATA_VERSION = original
+
+def growth_exponent(points: List[Tuple[int, float]]) -> float:
+    """Least-squares slope of log(time) against log(size): ~0 is constant, ~1 is linear"""
+    if len(points) < 2:
+        return 0.0
+    xs = [math.log(size) for size, _ in points]
+    ys = [math.log(max(value, 1e-9)) for _, value in points]
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denominator if denominator else 0.0
+
+def classify(exponent: float) -> str:
+    if exponent < 0.2:
+        return "constant"
+    elif exponent < 0.8:
+        return "sublinear"
+    elif exponent < 1.2:
+        return "linear"
+    return "superlinear"
+
+def scaling_report(results: Dict[str, Dict]) -> str:
+    """One row per benchmark with median time at each size and the fitted growth"""
+    curves: Dict[str, List[Tuple[int, float]]] = {}
+    for key, stats in results.items():
+        name, size = key.rsplit("[", 1)
+        curves.setdefault(name, []).append((int(size.rstrip("]")), stats["median_us"]))
+
+    sizes = sorted({size for points in curves.values() for size, _ in points})
+    name_width = max(len(name) for name in curves)
+    header = "benchmark".ljust(name_width) + "".join(f"n={size}".rjust(12) for size in sizes) + "  exponent  growth"
+    lines = ["Median µs by data size", header, "-" * len(header)]
+
+    for name, points in curves.items():
+        by_size = dict(points)
+        cells = "".join((f"{by_size[size]:.2f}" if size in by_size else "").rjust(12) for size in sizes)
+        exponent = growth_exponent(sorted(points))
+        lines.append(f"{name.ljust(name_width)}{cells}  {exponent:8.2f}  {classify(exponent)}")
+
+    return "\n".join(lines)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for ScenarioEngine and advisor tools")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--only", help="run only benchmarks whose name contains this text")
+    parser.add_argument("--json", help="write raw results to this file")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="fail if medians regress against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.3, help="allowed relative increase in median time")
+    return parser.parse_args(argv)
+
+def main_cli(argv=None) -> int:
+    args = parse_args(argv)
+    results = {}
+
+    for size in args.sizes:
+        print(f"⏱️ Running size {size}...", file=sys.stderr)
+        for name, stats in {**engine_benchmarks(size, args.only), **tool_benchmarks(size, args.only)}.items():
+            results[f"{name}[{size}]"] = stats
+
+    if not results:
+        print(f"No benchmark name contains {args.only!r}", file=sys.stderr)
+        return 1
+
+    print(format_table(results, ["min_us", "max_us", "mean_us", "stddev_us", "median_us", "iqr_us", "ops", "rounds"]))
+    print()
+    print(scaling_report(results))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    regressions = []
+    if args.compare:
+        baseline = load_baseline("micro")
+        for key, stats in results.items():
+            previous = baseline.get(key)
+            if previous and stats["median_us"] > previous["median_us"] * (1 + args.threshold):
+                regressions.append(f"{key}: median {stats['median_us']:.2f} µs vs baseline {previous['median_us']:.2f} µs")
+
+    if args.save_baseline:
+        print(f"💾 Baseline saved to {save_baseline('micro', results)}")
+
+    if regressions:
+        print("\n❌ Regressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
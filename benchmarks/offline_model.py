@@ -0,0 +1,48 @@
+"""
+Offline stand-in for the Strands agents so benchmarks run without AWS
+"""
+
+import asyncio
+
+import main
+from agent import fallback_responder
+from agent.agent_pool import AgentPool
+from agent.multi_agent_coordinator import multi_agent_coordinator
+
+CANNED_RESPONSE = (
+    "DROP to your hands and knees, COVER your head and neck, and HOLD ON until the shaking stops. "
+    "Move away from windows and heavy furniture, and do not use elevators."
+)
+
+class OfflineAgent:
+    """Mimics the agent interface used by the API with a fixed simulated model latency"""
+
+    def __init__(self, latency: float = 0.0, chunks: int = 8):
+        self.latency = latency
+        self.chunks = chunks
+        self.calls = 0
+
+    async def ainvoke(self, prompt: str) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return CANNED_RESPONSE
+
+    async def stream_async(self, prompt: str):
+        self.calls += 1
+        words = CANNED_RESPONSE.split(" ")
+        step = max(1, len(words) // self.chunks)
+        for i in range(0, len(words), step):
+            if self.latency:
+                await asyncio.sleep(self.latency / self.chunks)
+            yield {"data": " ".join(words[i:i + step]) + " "}
+
+def install_offline_agents(latency: float = 0.0) -> OfflineAgent:
+    """Replace the advisor and every coordinator agent pool with pools of one offline stand-in"""
+    agent = OfflineAgent(latency=latency)
+    # The stand-in serves concurrent calls, so each pool may hand it out as often as its size
+    advisor_pool = AgentPool(lambda: agent, fallback_responder.advisor_pool.size)
+    main.advisor_pool = fallback_responder.advisor_pool = advisor_pool
+    for role, pool in multi_agent_coordinator.agent_pools.items():
+        multi_agent_coordinator.agent_pools[role] = AgentPool(lambda: agent, pool.size)
+    return agent
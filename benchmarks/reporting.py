@@ -0,0 +1,83 @@
+"""
+Latency statistics, result tables and baseline comparison shared by the benchmarks
+"""
+
+import json
+import math
+import os
+import statistics
+from typing import Dict, List
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(latencies: List[float], elapsed: float) -> Dict:
+    """Throughput and latency distribution (milliseconds) for one benchmark"""
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "throughput": len(values) / elapsed if elapsed > 0 else 0.0,
+        "mean_ms": statistics.fmean(values) * 1000 if values else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": values[-1] * 1000 if values else 0.0
+    }
+
+def format_table(results: Dict[str, Dict], columns: List[str]) -> str:
+    """Render results as a fixed-width table, one row per benchmark"""
+    name_width = max([len("benchmark")] + [len(name) for name in results])
+    header = "benchmark".ljust(name_width) + "".join(column.rjust(14) for column in columns)
+    lines = [header, "-" * len(header)]
+
+    for name, stats in results.items():
+        cells = []
+        for column in columns:
+            value = stats.get(column, "")
+            cells.append((f"{value:.2f}" if isinstance(value, float) else str(value)).rjust(14))
+        lines.append(name.ljust(name_width) + "".join(cells))
+
+    return "\n".join(lines)
+
+def baseline_path(name: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+def save_baseline(name: str, results: Dict[str, Dict]) -> str:
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = baseline_path(name)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    return path
+
+def load_baseline(name: str) -> Dict[str, Dict]:
+    try:
+        with open(baseline_path(name), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def find_regressions(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """List benchmarks whose p95 latency rose or throughput fell by more than threshold"""
+    regressions = []
+
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+
+        if previous.get("p95_ms") and stats["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {stats['p95_ms']:.2f} ms vs baseline {previous['p95_ms']:.2f} ms"
+            )
+        if previous.get("throughput") and stats["throughput"] < previous["throughput"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {stats['throughput']:.1f}/s vs baseline {previous['throughput']:.1f}/s"
+            )
+
+    return regressions
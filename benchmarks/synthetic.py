@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Synthetic scenario catalogs and community data for load and scaling tests
+
+Generates data in the same schema as data/scenarios.json and
+data/community_data.json, at any size and reproducibly from a seed. Point
+the service at the output with SCENARIOS_FILE and COMMUNITY_DATA_FILE.
+
+Usage:
+    python -m benchmarks.synthetic --scenarios 10000 --choices 4 --cities 50 \\
+        --hospitals-per-city 200 --centers-per-city 100 --seed 42 --output-dir runtime/synthetic
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from typing import Dict, List, Tuple
+
+LOCATIONS = ["apartment", "office", "mall", "school", "vehicle"]
+
+FACILITY_FEATURES = ["open_space", "water", "medical_station", "restrooms", "power", "food"]
+
+# Real cities first so the advisor tools find data for them
+KNOWN_CITIES = {
+    "bangkok": (13.7563, 100.5018),
+    "yangon": (16.8409, 96.1735)
+}
+
+# Bounding box for generated cities (roughly mainland Southeast Asia)
+LATITUDE_RANGE = (5.0, 22.0)
+LONGITUDE_RANGE = (92.0, 110.0)
+
+def make_choices(rng: random.Random, prefix: str, count: int) -> list:
+    correct = rng.randrange(count)
+    return [
+        {
+            "id": f"{prefix}_c{i}",
+            "text": f"Option {i} for {prefix}",
+            "correct": i == correct,
+            "explanation": f"{'Correct' if i == correct else 'Unsafe'} choice for {prefix}.",
+            "score": 100 if i == correct else rng.randrange(0, 60, 10)
+        }
+        for i in range(count)
+    ]
+
+def make_scenario_catalog(num_scenarios: int, choices_per_scenario: int = 3, follow_up_choices: int = 2,
+                          follow_up_ratio: float = 1.0, seed: int = 0) -> Dict:
+    """Build a catalog in the data/scenarios.json schema"""
+    rng = random.Random(seed)
+    scenarios = []
+
+    for i in range(num_scenarios):
+        scenario_id = f"scenario_{i:06d}"
+        scenario = {
+            "id": scenario_id,
+            "title": f"Synthetic Scenario {i}",
+            "description": f"Synthetic earthquake scenario number {i}.",
+            "location": LOCATIONS[i % len(LOCATIONS)],
+            "time": rng.choice(["day", "night"]),
+            "magnitude": round(rng.uniform(4.5, 8.0), 1),
+            "choices": make_choices(rng, scenario_id, choices_per_scenario)
+        }
+        if follow_up_choices and rng.random() < follow_up_ratio:
+            scenario["follow_up"] = f"What do you do after scenario {i}?"
+            scenario["follow_up_choices"] = make_choices(rng, f"{scenario_id}_f", follow_up_choices)
+        scenarios.append(scenario)
+
+    return {
+        "scenarios": scenarios,
+        "scoring": {
+            "excellent": {"min_score": 90, "message": "Excellent earthquake response!"},
+            "good": {"min_score": 70, "message": "Good earthquake response!"},
+            "needs_improvement": {"min_score": 50, "message": "Your response needs improvement."},
+            "dangerous": {"min_score": 0, "message": "Your responses could be dangerous."}
+        },
+        "lessons": {
+            "by_location": {location: [f"Lesson for {location}"] for location in LOCATIONS},
+            "general": ["⚡ Remember: DROP, COVER, HOLD ON is the universal response"]
+        }
+    }
+
+def make_cities(rng: random.Random, num_cities: int) -> List[Tuple[str, float, float]]:
+    cities = [(name, lat, lon) for name, (lat, lon) in KNOWN_CITIES.items()][:num_cities]
+    for i in range(len(cities), num_cities):
+        cities.append((f"city_{i:05d}", round(rng.uniform(*LATITUDE_RANGE), 4), round(rng.uniform(*LONGITUDE_RANGE), 4)))
+    return cities
+
+def jitter(rng: random.Random, lat: float, lon: float, spread: float = 0.1) -> Tuple[float, float]:
+    """A point near a city centre"""
+    return round(lat + rng.uniform(-spread, spread), 5), round(lon + rng.uniform(-spread, spread), 5)
+
+def make_community_data(facilities_per_city: int, seed: int = 0, num_cities: int = 2,
+                        centers_per_city: int = None) -> Dict:
+    """Build community data in the data/community_data.json schema"""
+    rng = random.Random(seed)
+    centers_per_city = facilities_per_city if centers_per_city is None else centers_per_city
+    cities = make_cities(rng, num_cities)
+
+    data = {
+        "emergency_contacts": {
+            "thailand": {"emergency_hotline": "191", "medical_emergency": "1669", "fire_brigade": "199",
+                         "tourist_police": "1155", "disaster_management": "+66-2-124-9978"},
+            "myanmar": {"emergency_hotline": "999", "medical_emergency": "192", "fire_brigade": "191",
+                        "police": "199", "disaster_management": "+95-1-384-024"},
+            "international": {"red_cross": "+41-22-734-6001", "who_emergency": "+41-22-791-2111"}
+        },
+        "hospitals": {},
+        "evacuation_centers": {},
+        "earthquake_zones": {
+            "high_risk": [name for name, _, _ in cities[::3]],
+            "moderate_risk": [name for name, _, _ in cities[1::3]]
+        },
+        "languages": {"thailand": ["thai", "english"], "myanmar": ["burmese", "english"]}
+    }
+
+    for city, lat, lon in cities:
+        hospitals = []
+        for i in range(facilities_per_city):
+            h_lat, h_lon = jitter(rng, lat, lon)
+            hospitals.append({
+                "name": f"{city.title()} Hospital {i}",
+                "address": f"{i} Synthetic Road, {city.title()}",
+                "phone": f"+00-{i:07d}",
+                "emergency_24h": rng.random() < 0.8,
+                "trauma_center": rng.random() < 0.3,
+                "capacity": rng.randrange(50, 1500, 50),
+                "latitude": h_lat,
+                "longitude": h_lon
+            })
+        data["hospitals"][city] = hospitals
+
+        centers = []
+        for i in range(centers_per_city):
+            c_lat, c_lon = jitter(rng, lat, lon)
+            centers.append({
+                "name": f"{city.title()} Shelter {i}",
+                "address": f"{i} Shelter Lane, {city.title()}",
+                "capacity": rng.randrange(500, 20000, 500),
+                "facilities": rng.sample(FACILITY_FEATURES, 2),
+                "latitude": c_lat,
+                "longitude": c_lon
+            })
+        data["evacuation_centers"][city] = centers
+
+    return data
+
+def validate_catalog(catalog: Dict) -> List[str]:
+    """Check the fields ScenarioEngine relies on; returns a list of problems"""
+    problems = []
+    seen = set()
+
+    for scenario in catalog.get("scenarios", []):
+        for field in ("id", "title", "description", "choices"):
+            if field not in scenario:
+                problems.append(f"scenario {scenario.get('id', '?')} missing {field}")
+        if scenario.get("id") in seen:
+            problems.append(f"duplicate scenario id {scenario['id']}")
+        seen.add(scenario.get("id"))
+
+        if ("follow_up" in scenario) != ("follow_up_choices" in scenario):
+            problems.append(f"scenario {scenario.get('id')} has follow_up without follow_up_choices or vice versa")
+
+        for choice in scenario.get("choices", []) + scenario.get("follow_up_choices", []):
+            for field in ("id", "text", "score"):
+                if field not in choice:
+                    problems.append(f"choice in {scenario.get('id')} missing {field}")
+
+    return problems
+
+def validate_community_data(data: Dict) -> List[str]:
+    """Check the fields the advisor and coordinator tools rely on; returns a list of problems"""
+    problems = []
+
+    for section in ("emergency_contacts", "hospitals", "evacuation_centers"):
+        if section not in data:
+            problems.append(f"missing {section}")
+
+    for city, hospitals in data.get("hospitals", {}).items():
+        for hospital in hospitals:
+            for field in ("name", "address", "phone"):
+                if field not in hospital:
+                    problems.append(f"hospital in {city} missing {field}")
+
+    for city, centers in data.get("evacuation_centers", {}).items():
+        for center in centers:
+            if not isinstance(center.get("capacity"), int):
+                problems.append(f"evacuation center in {city} has no integer capacity")
+
+    return problems
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic scenarios and community data")
+    parser.add_argument("--scenarios", type=int, default=1000, help="number of scenarios")
+    parser.add_argument("--choices", type=int, default=3, help="choices per scenario")
+    parser.add_argument("--follow-up-choices", type=int, default=2, help="follow-up choices per scenario")
+    parser.add_argument("--follow-up-ratio", type=float, default=0.8, help="fraction of scenarios with a follow-up")
+    parser.add_argument("--cities", type=int, default=20, help="number of cities (Bangkok and Yangon come first)")
+    parser.add_argument("--hospitals-per-city", type=int, default=50)
+    parser.add_argument("--centers-per-city", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", default="runtime/synthetic")
+    args = parser.parse_args(argv)
+    if args.choices < 1:
+        parser.error("--choices must be at least 1")
+    return args
+
+def main_cli(argv=None) -> int:
+    args = parse_args(argv)
+
+    catalog = make_scenario_catalog(args.scenarios, args.choices, args.follow_up_choices, args.follow_up_ratio, args.seed)
+    community = make_community_data(args.hospitals_per_city, args.seed, args.cities, args.centers_per_city)
+
+    problems = validate_catalog(catalog) + validate_community_data(community)
+    if problems:
+        for problem in problems[:20]:
+            print(f"❌ {problem}", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    outputs = {"scenarios.json": catalog, "community_data.json": community}
+    for file_name, data in outputs.items():
+        path = os.path.join(args.output_dir, file_name)
+        with open(path, "w") as f:
+            json.dump(data, f, ensure_ascii=False)
+        print(f"✅ Wrote {path} ({os.path.getsize(path):,} bytes)")
+
+    print(f"\nRun the API against it with:\n"
+          f"  SCENARIOS_FILE={args.output_dir}/scenarios.json "
+          f"COMMUNITY_DATA_FILE={args.output_dir}/community_data.json python main.py")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
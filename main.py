@@ -1,19 +1,128 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from sse_starlette.sse import EventSourceResponse
+from contextlib import asynccontextmanager
 import asyncio
+import hmac
+import json
+import logging
 import os
 import uuid
+from typing import Callable, Dict, Optional
 
-from agent.earthquake_advisor import earthquake_advisor_agent
-from agent.multi_agent_coordinator import multi_agent_coordinator
-from simulation.scenario_engine import scenario_engine
+from agent.answer_cache import answer_cache, answer_key
+from agent.conversation import conversation_store
+from agent.earthquake_advisor import COMMUNITY_DATA_VERSION
+from agent.fallback_responder import (
+    FALLBACK_NOTE,
+    advisor_admission,
+    advisor_pool,
+    ask_with_fallback,
+    rule_based_answer,
+    stream_with_fallback
+)
+from agent.jobs import CallbackNotAllowed, job_manager
+from agent.multi_agent_coordinator import multi_agent_coordinator, INCIDENTS, InvalidTransition, UnknownStatus
+from agent.resilience import call_agent
+from agent.warmup import WARMUP_MODE, load_warmup_questions, warm_answer_cache, warmup_state
+from monitoring import metrics
+from monitoring.instrumentation import MetricsMiddleware
+from monitoring.profiler import ProfilerBusy, sampling_profiler, to_collapsed, to_speedscope
+from monitoring.structured_logging import configure_logging
+from monitoring.tracing import TracedJSONResponse, TracingMiddleware, configure_tracing
+from simulation.scenario_engine import scenario_engine, DEFAULT_SESSION_ID, SESSIONS
+from storage.shared_state import StateBusy
+from storage.versioning import content_version
+
+log_listener = configure_logging()
+tracer_provider = configure_tracing()
+logger = logging.getLogger(__name__)
+
+# Resolved incidents older than this are moved out of the hot set; 0 disables the archiver
+INCIDENT_ARCHIVE_AFTER_SECONDS = float(os.environ.get("INCIDENT_ARCHIVE_AFTER_SECONDS", 600))
+
+# Bump when the way questions are put to the advisor changes, so cached answers are recomputed
+ADVISOR_PROMPT_VERSION = "1"
+
+def location_question(question: str, location: str) -> str:
+    """The question with its location context, as put to the advisor"""
+    if location and location != "general":
+        return f"[Location: {location}] {question}"
+    return question
+
+def answer_version() -> str:
+    """Version of cached advisor answers: prompt, community data and model"""
+    return content_version([ADVISOR_PROMPT_VERSION, COMMUNITY_DATA_VERSION, advisor_pool.backend])
+
+async def run_warmup() -> None:
+    """Precompute answers to the top questions per location, then report this worker ready"""
+    async def answer(question: str, location: str) -> Optional[str]:
+        if WARMUP_MODE == "local":
+            # Warms the tools and community data only: a rule-based answer must not be served as the model's
+            rule_based_answer(question, location)
+            return None
+        # Warm-up calls count against the admission limit, so an admitted request always finds a free instance;
+        # when live traffic has taken every slot, the question is skipped (and counted as failed)
+        if not advisor_admission.try_acquire():
+            raise RuntimeError("No advisor capacity left for warm-up")
+        try:
+            return str(await call_agent("advisor", advisor_pool, location_question(question, location)))
+        finally:
+            advisor_admission.release()
+
+    try:
+        await warm_answer_cache(answer_cache, answer_version(), load_warmup_questions(), answer, warmup_state)
+    except Exception:
+        # Warm-up only saves model calls, so a worker whose warm-up fails still goes into rotation
+        logger.exception("warmup_failed")
+        warmup_state.status = "failed"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm-up runs in the background: /health answers at once, /ready once answers are cached
+    warmup = None
+    if WARMUP_MODE == "off":
+        warmup_state.status = "skipped"
+    else:
+        warmup = asyncio.create_task(run_warmup())
+    archiver = None
+    if INCIDENT_ARCHIVE_AFTER_SECONDS > 0:
+        archiver = asyncio.create_task(multi_agent_coordinator.run_archiver(
+            INCIDENT_ARCHIVE_AFTER_SECONDS, interval=min(60.0, INCIDENT_ARCHIVE_AFTER_SECONDS)
+        ))
+    session_pruner = asyncio.create_task(
+        scenario_engine.run_session_pruner(interval=min(300.0, scenario_engine.session_ttl))
+    )
+    result_flusher = None
+    if scenario_engine.result_exporter:
+        result_flusher = asyncio.create_task(scenario_engine.result_exporter.run_flusher())
+    job_manager.start()
+    yield
+    await job_manager.stop()
+    if warmup:
+        warmup.cancel()
+    if archiver:
+        archiver.cancel()
+    session_pruner.cancel()
+    if result_flusher:
+        result_flusher.cancel()
+    if tracer_provider:
+        tracer_provider.shutdown()
+    # Write out buffered drill results before the worker exits
+    if scenario_engine.result_exporter:
+        scenario_engine.result_exporter.flush()
+    # Drain queued log records last so shutdown messages are kept
+    if log_listener:
+        log_listener.stop()
 
 app = FastAPI(
     title="Disaster Ready: Earthquake Response Simulator",
     description="AI-powered earthquake preparedness simulator for Southeast Asia",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=TracedJSONResponse
 )
 
 # Enable CORS for web interface
@@ -25,22 +134,127 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(MetricsMiddleware)
+# Added last so it is outermost and the request id is set before anything else runs
+app.add_middleware(TracingMiddleware)
+
+metrics.registry.gauge(
+    "active_scenario_sessions", "Scenario sessions in progress",
+    lambda: {(): scenario_engine.state.count(SESSIONS)}
+)
+metrics.registry.gauge(
+    "active_incidents", "Incidents tracked by the coordinator",
+    lambda: {(): multi_agent_coordinator.state.count(INCIDENTS)}
+)
+metrics.registry.gauge(
+    "conversation_sessions", "Advisor conversations held in this worker",
+    lambda: {(): len(conversation_store)}
+)
+metrics.registry.gauge(
+    "background_jobs_queued", "Background incident jobs waiting for a worker in this process",
+    lambda: {(): job_manager.stats()[0]}
+)
+metrics.registry.gauge(
+    "answer_cache_entries", "Advisor answers cached in this worker",
+    lambda: {(): len(answer_cache)}
+)
+metrics.registry.gauge(
+    "incident_event_subscribers", "Open incident event streams in this worker",
+    lambda: {(): multi_agent_coordinator.events.subscriber_count}
+)
+
 class Query(BaseModel):
     question: str
     location: str = "general"
+    # Follow-up questions with the same session id see a bounded summary of the conversation so far
+    session_id: Optional[str] = None
 
 class Choice(BaseModel):
     choice_id: str
+    session_id: str = DEFAULT_SESSION_ID
 
 class ScenarioRequest(BaseModel):
     scenario_id: str = None
     location: str = None
     random: bool = False
+    session_id: str = DEFAULT_SESSION_ID
 
 class IncidentRequest(BaseModel):
     incident_type: str
     location: str
     severity: str = "medium"
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    # Return a job id at once and compute all agent responses in the background
+    background: bool = False
+    callback_url: Optional[str] = None
+
+class IncidentStatusRequest(BaseModel):
+    status: str
+
+# Static educational content, versioned so clients can cache it
+EARTHQUAKE_BASICS = {
+    "drop_cover_hold": {
+        "title": "DROP, COVER, and HOLD ON",
+        "description": "The universal earthquake response",
+        "steps": [
+            "DROP to your hands and knees immediately",
+            "COVER your head and neck with your arms; if under a table, hold on",
+            "HOLD ON to your shelter and protect yourself until shaking stops"
+        ]
+    },
+    "common_mistakes": [
+        "Running outside during shaking",
+        "Standing in doorways",
+        "Using elevators during/after earthquake",
+        "Stopping under overpasses while driving"
+    ],
+    "preparation_tips": [
+        "Create an emergency kit",
+        "Identify safe spots in each room",
+        "Practice earthquake drills",
+        "Secure heavy furniture and objects",
+        "Know how to turn off utilities"
+    ]
+}
+
+SOUTHEAST_ASIA_INFO = {
+    "high_risk_areas": [
+        "Northern Myanmar",
+        "Western Thailand", 
+        "Myanmar-Thailand Border Region"
+    ],
+    "recent_activity": {
+        "2024_myanmar_thailand": {
+            "magnitude": 6.8,
+            "location": "Myanmar-Thailand Border",
+            "affected_cities": ["Bangkok", "Yangon", "Chiang Mai"],
+            "lessons": [
+                "Cross-border preparedness is crucial",
+                "Urban areas need specific response plans",
+                "International coordination saves lives"
+            ]
+        }
+    },
+    "cultural_considerations": [
+        "Multi-language emergency communications",
+        "Community-based response systems",
+        "Integration with traditional building styles",
+        "Religious and cultural gathering places as shelters"
+    ]
+}
+
+EARTHQUAKE_BASICS_VERSION = content_version(EARTHQUAKE_BASICS)
+SOUTHEAST_ASIA_INFO_VERSION = content_version(SOUTHEAST_ASIA_INFO)
+
+def versioned_response(request: Request, version: str, build_content: Callable[[], Dict]) -> Response:
+    """Serve content with an ETag, answering 304 when the client already has this version"""
+    headers = {"ETag": f'"{version}"', "Cache-Control": "no-cache"}
+    not_modified = request.headers.get("if-none-match") == headers["ETag"]
+    metrics.record_cache("content_etag", not_modified)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return TracedJSONResponse(build_content(), headers=headers)
 
 @app.get("/")
 def read_root():
@@ -53,7 +267,9 @@ def read_root():
             "start_scenario": "/scenario/start - Start a scenario",
             "submit_choice": "/scenario/choice - Submit a choice",
             "multi_agent": "/multi-agent/* - Multi-agent coordination features",
-            "health": "/health - Health check"
+            "health": "/health - Health check",
+            "ready": "/ready - Readiness (answer cache warmed)",
+            "metrics": "/metrics - Prometheus metrics"
         }
     }
 
@@ -61,63 +277,185 @@ def read_root():
 def health_check():
     return {"status": "healthy", "service": "earthquake_simulator"}
 
+@app.get("/ready")
+def readiness_check():
+    """
+    Report whether this worker has finished warming its answer cache (503 until then).
+    """
+    if not warmup_state.ready:
+        return TracedJSONResponse({"status": "warming_up", "warmup": warmup_state.as_dict()}, status_code=503)
+    return {"status": "ready", "warmup": warmup_state.as_dict()}
+
+@app.get("/metrics")
+def get_metrics():
+    """
+    Expose request, agent, tool, cache and state metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+# Admin Endpoints
+def require_admin(token: str):
+    """Reject the request unless ADMIN_TOKEN is configured and matches"""
+    expected = os.environ.get("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not hmac.compare_digest(token, expected):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.post("/admin/profile")
+async def profile_worker(seconds: float = 10, interval_ms: float = 5, format: str = "collapsed",
+                         x_admin_token: str = Header(default=None)):
+    """
+    Run the sampling profiler on this worker for N seconds and return the profile.
+    """
+    require_admin(x_admin_token)
+    if not 0 < seconds <= 120:
+        raise HTTPException(status_code=400, detail="seconds must be between 0 and 120")
+    if format not in ("collapsed", "speedscope"):
+        raise HTTPException(status_code=400, detail="format must be collapsed or speedscope")
+    
+    try:
+        # Sample from a worker thread so the event loop keeps serving (and is itself profiled)
+        profile = await asyncio.to_thread(sampling_profiler.profile, seconds, max(interval_ms, 1) / 1000)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    file_name = f"profile-{os.getpid()}-{int(seconds)}s"
+    if format == "speedscope":
+        return TracedJSONResponse(
+            to_speedscope(profile, name=file_name),
+            headers={"Content-Disposition": f'attachment; filename="{file_name}.speedscope.json"'}
+        )
+    return PlainTextResponse(
+        to_collapsed(profile),
+        headers={"Content-Disposition": f'attachment; filename="{file_name}.collapsed.txt"'}
+    )
+
 # Agent Endpoints
 @app.post("/ask")
 async def ask_agent(query: Query):
     """
     Ask the earthquake advisor agent a question with optional location context.
+    Falls back to rule-based advice when the model fails, times out or is overloaded.
     """
     try:
         async def event_generator():
             # Enhance question with location context if provided
-            enhanced_question = query.question
-            if query.location and query.location != "general":
-                enhanced_question = f"[Location: {query.location}] {query.question}"
+            enhanced_question = location_question(query.question, query.location)
+            prompt = conversation_store.build_prompt(query.session_id, enhanced_question)
+            chunks = []
+            agent_stream = stream_with_fallback(advisor_pool, prompt, query.question, query.location)
+            async for chunk in agent_stream:
+                chunks.append(chunk)
+                yield {"data": chunk}
             
-            agent_stream = earthquake_advisor_agent.stream_async(enhanced_question)
-            async for event in agent_stream:
-                if "data" in event:
-                    yield {"data": event["data"]}
+            if query.session_id:
+                conversation_store.record(query.session_id, enhanced_question, "".join(chunks))
 
         return EventSourceResponse(event_generator())
     except Exception as e:
+        logger.exception("request_failed")
         raise HTTPException(status_code=500, detail=f"Agent error: {str(e)}")
 
 @app.post("/ask/direct")
 async def ask_agent_direct(query: Query):
     """
     Ask the agent and get a direct response (non-streaming).
+    Questions without conversation history are answered from the answer cache when possible.
+    Falls back to rule-based advice when the model fails, times out or is overloaded.
     """
     try:
-        enhanced_question = query.question
-        if query.location and query.location != "general":
-            enhanced_question = f"[Location: {query.location}] {query.question}"
+        enhanced_question = location_question(query.question, query.location)
+        prompt = conversation_store.build_prompt(query.session_id, enhanced_question)
+        
+        # Answers depend only on the question when there is no history to take into account
+        cache_key = answer_key(answer_version(), query.question, query.location) if prompt == enhanced_question else None
+        cached = answer_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            if query.session_id:
+                conversation_store.record(query.session_id, enhanced_question, cached)
+            return {"response": cached, "location": query.location, "cached": True}
         
-        response = await earthquake_advisor_agent.ainvoke(enhanced_question)
-        return {"response": response, "location": query.location}
+        response, fallback_reason = await ask_with_fallback(
+            advisor_pool, prompt, query.question, query.location
+        )
+        answer = str(response)
+        if query.session_id:
+            conversation_store.record(query.session_id, enhanced_question, answer)
+        if fallback_reason:
+            return {
+                "response": answer,
+                "location": query.location,
+                "degraded": True,
+                "fallback_reason": fallback_reason,
+                "note": FALLBACK_NOTE
+            }
+        if cache_key:
+            answer_cache.set(cache_key, answer)
+        return {"response": answer, "location": query.location}
     except Exception as e:
+        logger.exception("request_failed")
         raise HTTPException(status_code=500, detail=f"Agent error: {str(e)}")
 
 # Multi-Agent Coordination Endpoints
 @app.post("/multi-agent/incident")
-async def create_incident(request: IncidentRequest):
+async def create_incident(request: IncidentRequest, response: Response):
     """
     Create a new emergency incident for multi-agent coordination.
+    With background=true, returns 202 with a job id to poll instead of waiting for the agents.
     """
     try:
         incident_id = str(uuid.uuid4())[:8]  # Short ID for demo
         
-        incident = await multi_agent_coordinator.create_incident(
-            incident_id=incident_id,
-            incident_type=request.incident_type,
-            location=request.location,
-            severity=request.severity
-        )
+        def create():
+            return multi_agent_coordinator.create_incident(
+                incident_id=incident_id,
+                incident_type=request.incident_type,
+                location=request.location,
+                severity=request.severity,
+                latitude=request.latitude,
+                longitude=request.longitude
+            )
+        
+        if request.background:
+            async def run_incident_job():
+                await create()
+                return await multi_agent_coordinator.get_full_response(incident_id)
+            
+            job_id = uuid.uuid4().hex
+            job = job_manager.submit(job_id, run_incident_job, callback_url=request.callback_url, incident_id=incident_id)
+            response.status_code = 202
+            return {
+                "incident_id": incident_id,
+                "job_id": job_id,
+                "status": job["status"],
+                "status_url": f"/multi-agent/jobs/{job_id}"
+            }
+        
+        incident = await create()
         
         return {"incident_id": incident_id, "incident": incident}
+    except CallbackNotAllowed as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StateBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
+        logger.exception("request_failed")
         raise HTTPException(status_code=500, detail=f"Error creating incident: {str(e)}")
 
+@app.get("/multi-agent/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """
+    Get the status of a background incident job, including its result once completed.
+    """
+    try:
+        job = job_manager.get_job(job_id)
+    except StateBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 @app.get("/multi-agent/incident/{incident_id}")
 async def get_incident_status(incident_id: str):
     """
@@ -130,7 +468,10 @@ async def get_incident_status(incident_id: str):
         return status
     except HTTPException:
         raise
+    except StateBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
+        logger.exception("request_failed")
         raise HTTPException(status_code=500, detail=f"Error getting incident status: {str(e)}")
 
 @app.post("/multi-agent/incident/{incident_id}/response")
@@ -145,20 +486,107 @@ async def get_coordinated_response(incident_id: str):
         return response
     except HTTPException:
         raise
+    except StateBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
+        logger.exception("request_failed")
         raise HTTPException(status_code=500, detail=f"Error getting coordinated response: {str(e)}")
 
 @app.get("/multi-agent/incidents")
-async def list_active_incidents():
+async def list_active_incidents(status: Optional[str] = None):
     """
-    List all active emergency incidents.
+    List all active emergency incidents, optionally only those with the given status.
     """
     try:
-        incidents = multi_agent_coordinator.list_active_incidents()
+        incidents = multi_agent_coordinator.list_active_incidents(status)
         return {"active_incidents": incidents, "count": len(incidents)}
+    except UnknownStatus as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StateBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
+        logger.exception("request_failed")
         raise HTTPException(status_code=500, detail=f"Error listing incidents: {str(e)}")
 
+@app.get("/multi-agent/incidents/archived")
+async def list_archived_incidents(limit: int = 50, offset: int = 0):
+    """
+    List archived emergency incidents a page at a time, most recently archived first.
+    """
+    if not 1 <= limit <= 500 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 500 and offset at least 0")
+    
+    try:
+        incidents = multi_agent_coordinator.list_archived_incidents(limit, offset)
+        return {
+            "archived_incidents": incidents,
+            "count": len(incidents),
+            "total": multi_agent_coordinator.archive.count(),
+            "limit": limit,
+            "offset": offset
+        }
+    except Exception as e:
+        logger.exception("request_failed")
+        raise HTTPException(status_code=500, detail=f"Error listing archived incidents: {str(e)}")
+
+@app.post("/multi-agent/incident/{incident_id}/status")
+async def update_incident_status(incident_id: str, request: IncidentStatusRequest):
+    """
+    Move an incident through its lifecycle (active, stabilizing, resolved, archived).
+    """
+    try:
+        incident = multi_agent_coordinator.update_incident_status(incident_id, request.status)
+        if "error" in incident:
+            raise HTTPException(status_code=404, detail=incident["error"])
+        return incident
+    except UnknownStatus as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except InvalidTransition as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except HTTPException:
+        raise
+    except StateBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.exception("request_failed")
+        raise HTTPException(status_code=500, detail=f"Error updating incident status: {str(e)}")
+
+def incident_event_stream(incident_id: Optional[str], since: Optional[int], last_event_id: Optional[str]) -> EventSourceResponse:
+    """SSE stream of incident events, resuming after `since` or the Last-Event-ID header.
+
+    Replay needs the worker that issued the events; any other worker starts the
+    stream with a stream.reset event.
+    """
+    events = multi_agent_coordinator.events
+    reset = None
+    if since is None and last_event_id:
+        since = events.parse_event_id(last_event_id)
+        if since is None:
+            reset = "unknown_stream"
+
+    async def event_generator():
+        async for event in events.subscribe(incident_id, since, reset):
+            yield {"id": events.event_id(event), "event": event["type"], "data": json.dumps(event)}
+
+    return EventSourceResponse(event_generator())
+
+@app.get("/multi-agent/events")
+async def stream_all_incident_events(since: Optional[int] = None, last_event_id: Optional[str] = Header(None)):
+    """
+    Subscribe to events for all incidents (created, agent responses, status changes).
+    """
+    return incident_event_stream(None, since, last_event_id)
+
+@app.get("/multi-agent/incident/{incident_id}/events")
+async def stream_incident_events(incident_id: str, since: Optional[int] = None,
+                                 last_event_id: Optional[str] = Header(None)):
+    """
+    Subscribe to events for a specific incident.
+    """
+    if not multi_agent_coordinator.state.get(INCIDENTS, incident_id):
+        raise HTTPException(status_code=404, detail="Incident not found")
+    return incident_event_stream(incident_id, since, last_event_id)
+
 @app.post("/multi-agent/incident/{incident_id}/medical")
 async def get_medical_response(incident_id: str):
     """
@@ -167,7 +595,10 @@ async def get_medical_response(incident_id: str):
     try:
         response = await multi_agent_coordinator.get_medical_response(incident_id)
         return {"medical_response": response}
+    except StateBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
+        logger.exception("request_failed")
         raise HTTPException(status_code=500, detail=f"Error getting medical response: {str(e)}")
 
 @app.post("/multi-agent/incident/{incident_id}/evacuation")
@@ -178,19 +609,26 @@ async def get_evacuation_response(incident_id: str):
     try:
         response = await multi_agent_coordinator.get_evacuation_response(incident_id)
         return {"evacuation_response": response}
+    except StateBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
+        logger.exception("request_failed")
         raise HTTPException(status_code=500, detail=f"Error getting evacuation response: {str(e)}")
 
 # Simulation Endpoints
 @app.get("/scenarios")
-def get_scenarios():
+def get_scenarios(request: Request):
     """
     Get list of available earthquake scenarios.
     """
     try:
-        scenarios = scenario_engine.get_available_scenarios()
-        return {"scenarios": scenarios}
+        return versioned_response(
+            request,
+            scenario_engine.content_version,
+            lambda: {"scenarios": scenario_engine.get_available_scenarios()}
+        )
     except Exception as e:
+        logger.exception("request_failed")
         raise HTTPException(status_code=500, detail=f"Error loading scenarios: {str(e)}")
 
 @app.post("/scenario/start")
@@ -200,11 +638,11 @@ def start_scenario(request: ScenarioRequest):
     """
     try:
         if request.random:
-            result = scenario_engine.get_random_scenario()
+            result = scenario_engine.get_random_scenario(request.session_id)
         elif request.location:
-            result = scenario_engine.get_scenario_by_location(request.location)
+            result = scenario_engine.get_scenario_by_location(request.location, request.session_id)
         elif request.scenario_id:
-            result = scenario_engine.start_scenario(request.scenario_id)
+            result = scenario_engine.start_scenario(request.scenario_id, request.session_id)
         else:
             raise HTTPException(status_code=400, detail="Must specify scenario_id, location, or random=True")
         
@@ -215,6 +653,7 @@ def start_scenario(request: ScenarioRequest):
     except HTTPException:
         raise
     except Exception as e:
+        logger.exception("request_failed")
         raise HTTPException(status_code=500, detail=f"Error starting scenario: {str(e)}")
 
 @app.post("/scenario/choice")
@@ -223,7 +662,7 @@ def submit_choice(choice: Choice):
     Submit a choice for the current scenario.
     """
     try:
-        result = scenario_engine.submit_choice(choice.choice_id)
+        result = scenario_engine.submit_choice(choice.choice_id, choice.session_id)
         
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
@@ -232,85 +671,47 @@ def submit_choice(choice: Choice):
     except HTTPException:
         raise
     except Exception as e:
+        logger.exception("request_failed")
         raise HTTPException(status_code=500, detail=f"Error submitting choice: {str(e)}")
 
 @app.get("/scenario/status")
-def get_scenario_status():
+def get_scenario_status(session_id: str = DEFAULT_SESSION_ID):
     """
     Get current scenario status.
     """
     try:
-        has_active = scenario_engine.current_scenario is not None
-        return {
-            "has_active_scenario": has_active,
-            "current_score": scenario_engine.score,
-            "max_score": scenario_engine.max_score,
-            "choices_made": len(scenario_engine.user_choices)
-        }
+        return scenario_engine.get_session_status(session_id)
     except Exception as e:
+        logger.exception("request_failed")
         raise HTTPException(status_code=500, detail=f"Error getting status: {str(e)}")
 
 # Educational Endpoints
-@app.get("/learn/basics")
-def get_earthquake_basics():
+@app.get("/content/version")
+def get_content_versions():
     """
-    Get basic earthquake safety information.
+    Get the current version of each cacheable content endpoint.
     """
     return {
-        "drop_cover_hold": {
-            "title": "DROP, COVER, and HOLD ON",
-            "description": "The universal earthquake response",
-            "steps": [
-                "DROP to your hands and knees immediately",
-                "COVER your head and neck with your arms; if under a table, hold on",
-                "HOLD ON to your shelter and protect yourself until shaking stops"
-            ]
-        },
-        "common_mistakes": [
-            "Running outside during shaking",
-            "Standing in doorways",
-            "Using elevators during/after earthquake",
-            "Stopping under overpasses while driving"
-        ],
-        "preparation_tips": [
-            "Create an emergency kit",
-            "Identify safe spots in each room",
-            "Practice earthquake drills",
-            "Secure heavy furniture and objects",
-            "Know how to turn off utilities"
-        ]
+        "versions": {
+            "/scenarios": scenario_engine.content_version,
+            "/learn/basics": EARTHQUAKE_BASICS_VERSION,
+            "/learn/southeast-asia": SOUTHEAST_ASIA_INFO_VERSION
+        }
     }
 
+@app.get("/learn/basics")
+def get_earthquake_basics(request: Request):
+    """
+    Get basic earthquake safety information.
+    """
+    return versioned_response(request, EARTHQUAKE_BASICS_VERSION, lambda: EARTHQUAKE_BASICS)
+
 @app.get("/learn/southeast-asia")
-def get_regional_info():
+def get_regional_info(request: Request):
     """
     Get Southeast Asia specific earthquake information.
     """
-    return {
-        "high_risk_areas": [
-            "Northern Myanmar",
-            "Western Thailand", 
-            "Myanmar-Thailand Border Region"
-        ],
-        "recent_activity": {
-            "2024_myanmar_thailand": {
-                "magnitude": 6.8,
-                "location": "Myanmar-Thailand Border",
-                "affected_cities": ["Bangkok", "Yangon", "Chiang Mai"],
-                "lessons": [
-                    "Cross-border preparedness is crucial",
-                    "Urban areas need specific response plans",
-                    "International coordination saves lives"
-                ]
-            }
-        },
-        "cultural_considerations": [
-            "Multi-language emergency communications",
-            "Community-based response systems",
-            "Integration with traditional building styles",
-            "Religious and cultural gathering places as shelters"
-        ]
-    }
+    return versioned_response(request, SOUTHEAST_ASIA_INFO_VERSION, lambda: SOUTHEAST_ASIA_INFO)
 
 @app.get("/demo/multi-agent")
 async def demo_multi_agent():
@@ -338,9 +739,27 @@ async def demo_multi_agent():
             "explanation": "This demonstrates how multiple AI agents coordinate emergency response - medical, evacuation, and coordination agents working together."
         }
     except Exception as e:
+        logger.exception("request_failed")
         raise HTTPException(status_code=500, detail=f"Demo error: {str(e)}")
 
+def resolve_worker_count(setting: str) -> int:
+    """Translate the WORKERS setting ("auto" or a number) into a process count"""
+    if setting == "auto":
+        try:
+            return len(os.sched_getaffinity(0))
+        except AttributeError:
+            return os.cpu_count() or 1
+    return max(1, int(setting))
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port) 
\ No newline at end of file
+    workers = resolve_worker_count(os.environ.get("WORKERS", "1"))
+    
+    if workers > 1:
+        # Workers are separate processes, so sessions and incidents must live in shared storage
+        if os.environ.setdefault("STATE_BACKEND", "sqlite") == "memory":
+            raise SystemExit("STATE_BACKEND=memory cannot be shared between workers; use sqlite")
+        uvicorn.run("main:app", host="0.0.0.0", port=port, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=port) 
\ No newline at end of file
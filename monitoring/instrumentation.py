@@ -0,0 +1,159 @@
+import functools
+import logging
+import time
+from typing import AsyncIterator, Callable, Optional, Tuple
+
+from opentelemetry import trace
+
+from agent.tool_output import TokenBudget, agent_tool_output
+from monitoring import metrics
+from monitoring.tracing import request_id_var, start_span, tracer
+
+logger = logging.getLogger(__name__)
+
+def token_usage(result) -> Tuple[int, int]:
+    """(input, output) tokens reported by a Strands AgentResult, or zeros if unavailable"""
+    usage = getattr(getattr(result, "metrics", None), "accumulated_usage", None) or {}
+    return usage.get("inputTokens", 0), usage.get("outputTokens", 0)
+
+def _record_tokens(role: str, result, span) -> Tuple[int, int]:
+    input_tokens, output_tokens = token_usage(result)
+    if input_tokens:
+        metrics.agent_tokens.inc(role, "input", amount=input_tokens)
+    if output_tokens:
+        metrics.agent_tokens.inc(role, "output", amount=output_tokens)
+    span.set_attribute("agent.input_tokens", input_tokens)
+    span.set_attribute("agent.output_tokens", output_tokens)
+    return input_tokens, output_tokens
+
+def _log_agent_call(role: str, outcome: str, start: float, streaming: bool, tokens: Tuple[int, int] = (0, 0),
+                    budget: Optional[TokenBudget] = None) -> None:
+    extra = {
+        "role": role,
+        "outcome": outcome,
+        "streaming": streaming,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        "input_tokens": tokens[0],
+        "output_tokens": tokens[1]
+    }
+    if budget is not None:
+        # Local estimates, available even when the model reports no usage
+        extra.update(estimated_prompt_tokens=budget.prompt_tokens, estimated_tool_tokens=budget.tool_tokens)
+    logger.log(logging.INFO if outcome == "success" else logging.WARNING, "agent_call", extra=extra)
+
+async def invoke_agent(role: str, agent, prompt: str):
+    """Invoke an agent, recording latency, outcome and token usage for its role"""
+    with start_span(f"agent.{role}", **{"agent.role": role, "agent.prompt_chars": len(prompt)}) as span:
+        start = time.perf_counter()
+        try:
+            # Tools called during this request return compact output within a token budget
+            with agent_tool_output(prompt) as budget:
+                result = await agent.ainvoke(prompt)
+        except Exception:
+            metrics.agent_calls.inc(role, "error")
+            _log_agent_call(role, "error", start, streaming=False)
+            raise
+        finally:
+            metrics.agent_call_duration.observe(time.perf_counter() - start, role)
+
+        metrics.agent_calls.inc(role, "success")
+        _log_agent_call(role, "success", start, streaming=False, tokens=_record_tokens(role, result, span), budget=budget)
+        return result
+
+async def stream_agent(role: str, agent, prompt: str) -> AsyncIterator[dict]:
+    """Stream agent events, recording the same metrics as invoke_agent once the stream ends"""
+    # The span is not made current: an async generator may resume in another context
+    attributes = {"agent.role": role, "agent.prompt_chars": len(prompt), "agent.streaming": True}
+    if request_id_var.get():
+        attributes["request.id"] = request_id_var.get()
+    span = tracer.start_span(f"agent.{role}", attributes=attributes)
+
+    start = time.perf_counter()
+    tokens = (0, 0)
+    try:
+        with agent_tool_output(prompt) as budget:
+            async for event in agent.stream_async(prompt):
+                if "result" in event:
+                    tokens = _record_tokens(role, event["result"], span)
+                yield event
+    except Exception as e:
+        metrics.agent_calls.inc(role, "error")
+        _log_agent_call(role, "error", start, streaming=True)
+        span.record_exception(e)
+        span.set_status(trace.Status(trace.StatusCode.ERROR))
+        raise
+    finally:
+        metrics.agent_call_duration.observe(time.perf_counter() - start, role)
+        span.end()
+
+    metrics.agent_calls.inc(role, "success")
+    _log_agent_call(role, "success", start, streaming=True, tokens=tokens, budget=budget)
+
+def instrument_tool(func: Callable) -> Callable:
+    """Count, time and trace a tool function; apply beneath @tool so Strands still sees the signature"""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with start_span(f"tool.{name}", **{"tool.name": name}):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = func(*args, **kwargs)
+                outcome = "success"
+                return result
+            finally:
+                duration = time.perf_counter() - start
+                metrics.tool_duration.observe(duration, name)
+                metrics.tool_invocations.inc(name)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("tool_call", extra={
+                        "tool": name,
+                        "outcome": outcome,
+                        "duration_ms": round(duration * 1000, 3),
+                        "sample_key": f"tool:{name}"
+                    })
+
+    return wrapper
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, latency and an access log line per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Route templates keep label cardinality bounded; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            duration = time.perf_counter() - start
+            metrics.http_request_duration.observe(duration, method, route)
+            metrics.http_requests.inc(method, route, str(status["code"]))
+            # Sampling by route keeps high-volume endpoints from flooding the log; errors are always kept
+            logger.log(
+                logging.ERROR if status["code"] >= 500 else logging.INFO,
+                "http_request",
+                extra={
+                    "method": method,
+                    "route": route,
+                    "path": scope["path"],
+                    "status": status["code"],
+                    "duration_ms": round(duration * 1000, 2),
+                    "sample_key": route
+                }
+            )
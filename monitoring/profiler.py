@@ -0,0 +1,109 @@
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Tuple
+
+# Deepest stack recorded per sample; deeper frames are cut at the root end
+MAX_STACK_DEPTH = 128
+
+Stack = Tuple[str, ...]
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is requested while another one is running"""
+
+class SamplingProfiler:
+    """Periodically samples the Python stack of every thread in the process.
+
+    Sampling happens from a separate thread with sys._current_frames(), so the
+    profiled code runs unmodified; overhead is one stack walk per thread per interval.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def profile(self, seconds: float, interval: float = 0.005) -> Dict:
+        """Sample for the given duration; blocks the calling thread, so run it off the event loop"""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+
+        try:
+            samples: Counter = Counter()
+            own_thread = threading.get_ident()
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            start = time.perf_counter()
+            deadline = start + seconds
+            total = 0
+
+            while time.perf_counter() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    samples[self._stack(thread_names.get(thread_id, str(thread_id)), frame)] += 1
+                total += 1
+                time.sleep(interval)
+
+            return {
+                "samples": samples,
+                "interval": interval,
+                "duration": time.perf_counter() - start,
+                "sample_rounds": total
+            }
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _stack(thread_name: str, frame) -> Stack:
+        frames = []
+        while frame is not None and len(frames) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.append(f"thread {thread_name}")
+        return tuple(reversed(frames))
+
+def to_collapsed(profile: Dict) -> str:
+    """Brendan Gregg's collapsed-stack format, one "root;...;leaf count" line per unique stack"""
+    lines = [f"{';'.join(stack)} {count}" for stack, count in profile["samples"].most_common()]
+    return "\n".join(lines) + "\n"
+
+def to_speedscope(profile: Dict, name: str = "earthquake_simulator") -> Dict:
+    """Speedscope sampled-profile JSON, weighted in seconds"""
+    frame_index: Dict[str, int] = {}
+    frames = []
+    samples = []
+    weights = []
+
+    for stack, count in profile["samples"].items():
+        indices = []
+        for frame_name in stack:
+            if frame_name not in frame_index:
+                frame_index[frame_name] = len(frames)
+                function, _, location = frame_name.partition(" (")
+                file_name, _, line = location.rstrip(")").rpartition(":")
+                frame = {"name": function}
+                if file_name:
+                    frame.update({"file": file_name, "line": int(line)})
+                frames.append(frame)
+            indices.append(frame_index[frame_name])
+        samples.append(indices)
+        weights.append(count * profile["interval"])
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "earthquake_simulator sampling profiler",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights
+        }]
+    }
+
+# Global profiler; only one profile runs at a time per process
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,122 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from monitoring import metrics
+from monitoring.tracing import request_id_var
+
+log_records_dropped = metrics.registry.counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full"
+)
+
+# Attributes every LogRecord has; anything else was passed through extra= and is emitted as a field
+_STANDARD_ATTRIBUTES = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "request_id", "sample_key"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, event, request id and any extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage()
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of records per sample_key (e.g. a route); warnings and errors are always kept"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, "sample_key", None))
+        return rate is None or random.random() < rate
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the background writer without formatting them or ever blocking the caller"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same-process queue: pass the record as-is and let the writer thread format it
+        record.request_id = request_id_var.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.inc()
+
+def parse_sample_rates(setting: str) -> Dict[str, float]:
+    """Parse LOG_SAMPLE_RATES, e.g. "/scenarios=0.1,/learn/basics=0.05" """
+    rates = {}
+    for item in filter(None, (part.strip() for part in setting.split(","))):
+        key, _, rate = item.rpartition("=")
+        rates[key] = float(rate)
+    return rates
+
+# The application's own loggers; third-party libraries keep their own configuration
+APP_LOGGERS = ("main", "__main__", "agent", "monitoring", "simulation", "storage", "benchmarks")
+
+def configure_logging() -> Optional[logging.handlers.QueueListener]:
+    """Route the application's logging through a bounded queue to a background JSON writer.
+
+    Writes to LOG_FILE with size-based rotation, or to stdout when LOG_FILE is unset.
+    Rotation is per process, so multi-worker deployments should put {pid} in LOG_FILE.
+    Only APP_LOGGERS are configured unless LOG_ROOT=on, which routes every library's
+    records through the root logger as well.
+    """
+    if os.environ.get("LOG_FORMAT", "json").lower() == "off":
+        return None
+
+    if os.environ.get("LOG_FILE"):
+        path = os.environ["LOG_FILE"].replace("{pid}", str(os.getpid()))
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        writer = logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=int(os.environ.get("LOG_MAX_BYTES", 50 * 1024 * 1024)),
+            backupCount=int(os.environ.get("LOG_BACKUP_COUNT", 5)),
+            encoding="utf-8"
+        )
+    else:
+        writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(JsonFormatter())
+
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=int(os.environ.get("LOG_QUEUE_SIZE", 10000))))
+    handler.addFilter(SamplingFilter(parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES", ""))))
+
+    level = os.environ.get("LOG_LEVEL", "INFO").upper()
+    if os.environ.get("LOG_ROOT", "off").lower() == "on":
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(handler)
+    else:
+        for name in APP_LOGGERS:
+            app_logger = logging.getLogger(name)
+            app_logger.setLevel(level)
+            app_logger.addHandler(handler)
+            # Not passed on to whatever the root logger writes to, so records are not duplicated
+            app_logger.propagate = False
+
+    listener = logging.handlers.QueueListener(handler.queue, writer, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,104 @@
+import os
+import uuid
+from contextvars import ContextVar
+from typing import Optional, Sequence
+
+from fastapi.responses import JSONResponse
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+    SpanExportResult,
+)
+
+# Request id of the HTTP request being handled, propagated to every span and log line
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+REQUEST_ID_HEADER = "x-request-id"
+
+tracer = trace.get_tracer("earthquake_simulator")
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Append finished spans to a local file, one JSON document per line"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", buffering=1)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        for span in spans:
+            self._file.write(span.to_json(indent=None) + "\n")
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        self._file.close()
+
+def configure_tracing() -> Optional[TracerProvider]:
+    """Install a tracer provider for TRACING_EXPORTER (console or file); tracing is a no-op otherwise"""
+    exporter_name = os.environ.get("TRACING_EXPORTER", "none").lower()
+
+    if exporter_name == "none":
+        return None
+    elif exporter_name == "console":
+        exporter = ConsoleSpanExporter()
+    elif exporter_name == "file":
+        exporter = JsonLinesSpanExporter(os.environ.get("TRACING_FILE", "runtime/traces.jsonl"))
+    else:
+        raise ValueError(f"Unknown TRACING_EXPORTER: {exporter_name}")
+
+    provider = TracerProvider(resource=Resource.create({"service.name": "earthquake_simulator"}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    return provider
+
+def start_span(name: str, **attributes):
+    """Start a child span of the current one, tagged with the current request id"""
+    request_id = request_id_var.get()
+    if request_id:
+        attributes["request.id"] = request_id
+    return tracer.start_as_current_span(name, attributes=attributes)
+
+class TracedJSONResponse(JSONResponse):
+    """JSONResponse whose serialization shows up as its own span"""
+
+    def render(self, content) -> bytes:
+        with start_span("serialize.json"):
+            return super().render(content)
+
+class TracingMiddleware:
+    """ASGI middleware opening a root span per request and propagating the X-Request-ID header"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers", []))
+        request_id = headers.get(REQUEST_ID_HEADER.encode(), b"").decode() or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(REQUEST_ID_HEADER.encode(), request_id.encode())]
+                span.set_attribute("http.status_code", message["status"])
+            await send(message)
+
+        try:
+            with start_span(f"HTTP {scope['method']}", **{"http.method": scope["method"], "http.target": scope["path"]}) as span:
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    route = getattr(scope.get("route"), "path", "unmatched")
+                    span.set_attribute("http.route", route)
+                    span.update_name(f"HTTP {scope['method']} {route}")
+        finally:
+            request_id_var.reset(token)
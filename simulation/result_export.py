@@ -0,0 +1,192 @@
+import asyncio
+import csv
+import glob
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; fall back to CSV chunks
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Column order shared by every export format
+RESULT_COLUMNS = ("scenario_id", "choice_path", "score", "max_score", "performance_level", "timestamp")
+
+# Separator used to flatten the list of choice ids into a single column
+CHOICE_PATH_SEPARATOR = ">"
+
+FILE_EXTENSIONS = {
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+    "csv": ".csv"
+}
+
+def default_export_format() -> str:
+    """Pick the most compact format supported by the installed libraries"""
+    return "parquet" if pa is not None else "csv"
+
+class ResultExporter:
+    """Buffers completed simulation results and writes them to rotating columnar files.
+
+    A file is written when the buffer holds rows_per_file rows or, via
+    run_flusher, once flush_seconds have passed, so a quiet worker does not hold
+    results indefinitely. Rows of a failed write go back into the buffer for the
+    next attempt, up to max_buffered_rows.
+    """
+
+    def __init__(self, directory: str, rows_per_file: int = 10000, file_format: Optional[str] = None,
+                 flush_seconds: float = 60.0, max_buffered_rows: Optional[int] = None):
+        file_format = file_format or default_export_format()
+        if file_format not in FILE_EXTENSIONS:
+            raise ValueError(f"Unsupported export format: {file_format}")
+        if file_format != "csv" and pa is None:
+            raise ValueError(f"Export format '{file_format}' requires pyarrow")
+
+        self.directory = directory
+        self.rows_per_file = rows_per_file
+        self.file_format = file_format
+        self.flush_seconds = flush_seconds
+        self.max_buffered_rows = max_buffered_rows or 10 * rows_per_file
+        self._buffer = {column: [] for column in RESULT_COLUMNS}
+        self._buffered_rows = 0
+        self._file_sequence = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+
+    def record(self, result) -> None:
+        """Add a completed SimulationResult to the buffer, rotating to a new file when full"""
+        with self._lock:
+            self._buffer["scenario_id"].append(result.scenario_id)
+            self._buffer["choice_path"].append(CHOICE_PATH_SEPARATOR.join(result.user_choices))
+            self._buffer["score"].append(result.total_score)
+            self._buffer["max_score"].append(result.max_score)
+            self._buffer["performance_level"].append(result.performance_level)
+            self._buffer["timestamp"].append(result.timestamp)
+            self._buffered_rows += 1
+
+            if self._buffered_rows < self.rows_per_file:
+                return
+            columns, path = self._swap_buffer()
+
+        self._write_or_keep(columns, path)
+
+    def flush(self) -> Optional[str]:
+        """Write any buffered results to a file and return its path, or None if nothing was written"""
+        with self._lock:
+            if not self._buffered_rows:
+                return None
+            columns, path = self._swap_buffer()
+
+        return path if self._write_or_keep(columns, path) else None
+
+    async def run_flusher(self) -> None:
+        """Flush buffered results every flush_seconds until cancelled"""
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await asyncio.to_thread(self.flush)
+
+    def _write_or_keep(self, columns: Dict[str, List], path: str) -> bool:
+        """Write a detached buffer; on failure put its rows back in front of the buffer for the next write"""
+        try:
+            self._write(columns, path)
+            return True
+        except Exception:
+            logger.exception("result_export_failed", extra={"path": path, "rows": len(columns["scenario_id"])})
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+
+        with self._lock:
+            for column in RESULT_COLUMNS:
+                self._buffer[column][:0] = columns[column]
+            self._buffered_rows += len(columns["scenario_id"])
+            overflow = self._buffered_rows - self.max_buffered_rows
+            if overflow > 0:
+                # The export target has been failing for a while; keep the newest results
+                for column in RESULT_COLUMNS:
+                    del self._buffer[column][:overflow]
+                self._buffered_rows -= overflow
+                logger.warning("result_export_rows_dropped", extra={"rows": overflow})
+        return False
+
+    def _swap_buffer(self):
+        """Detach the current buffer and reserve a file name for it (caller holds the lock)"""
+        columns = self._buffer
+        self._buffer = {column: [] for column in RESULT_COLUMNS}
+        self._buffered_rows = 0
+        self._file_sequence += 1
+
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        file_name = f"results-{stamp}-{os.getpid()}-{self._file_sequence:05d}{FILE_EXTENSIONS[self.file_format]}"
+        return columns, os.path.join(self.directory, file_name)
+
+    def _write(self, columns: Dict[str, List], path: str) -> None:
+        """Write one chunk atomically so readers never see a partial file"""
+        tmp_path = path + ".tmp"
+
+        if self.file_format == "csv":
+            with open(tmp_path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(RESULT_COLUMNS)
+                writer.writerows(zip(*(columns[column] for column in RESULT_COLUMNS)))
+        else:
+            table = pa.table({
+                "scenario_id": pa.array(columns["scenario_id"], type=pa.string()),
+                "choice_path": pa.array(columns["choice_path"], type=pa.string()),
+                "score": pa.array(columns["score"], type=pa.int32()),
+                "max_score": pa.array(columns["max_score"], type=pa.int32()),
+                "performance_level": pa.array(columns["performance_level"], type=pa.dictionary(pa.int8(), pa.string())),
+                "timestamp": pa.array(columns["timestamp"], type=pa.string())
+            })
+            if self.file_format == "parquet":
+                pq.write_table(table, tmp_path, compression="zstd")
+            else:
+                feather.write_feather(table, tmp_path, compression="zstd")
+
+        os.replace(tmp_path, path)
+
+def load_results(directory: str, columns: Optional[Sequence[str]] = None):
+    """Load exported results into a pandas DataFrame, reading only the requested columns"""
+    import pandas as pd
+
+    columns = list(columns) if columns else list(RESULT_COLUMNS)
+    unknown = [column for column in columns if column not in RESULT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown result columns: {', '.join(unknown)}")
+
+    frames = []
+    for path in sorted(glob.glob(os.path.join(directory, "results-*"))):
+        if path.endswith(".parquet"):
+            frames.append(pd.read_parquet(path, columns=columns))
+        elif path.endswith(".arrow"):
+            frames.append(pd.read_feather(path, columns=columns))
+        elif path.endswith(".csv"):
+            frames.append(pd.read_csv(path, usecols=columns)[columns])
+
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    df = pd.concat(frames, ignore_index=True)
+    if "timestamp" in df.columns:
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+    return df
+
+def create_result_exporter() -> Optional[ResultExporter]:
+    """Create an exporter from environment configuration, or None when export is disabled"""
+    directory = os.environ.get("RESULTS_EXPORT_DIR")
+    if not directory:
+        return None
+
+    return ResultExporter(
+        directory=directory,
+        rows_per_file=int(os.environ.get("RESULTS_EXPORT_ROWS_PER_FILE", 10000)),
+        file_format=os.environ.get("RESULTS_EXPORT_FORMAT") or None,
+        flush_seconds=float(os.environ.get("RESULTS_EXPORT_FLUSH_SECONDS", 60))
+    )
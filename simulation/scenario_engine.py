@@ -1,8 +1,27 @@
+import asyncio
 import json
+import logging
+import os
 import random
-from typing import Dict, List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+from simulation.result_export import ResultExporter, create_result_exporter
+from storage.shared_state import StateBackend, StateBusy, InMemoryStateBackend, state_backend
+from storage.versioning import content_version
+
+logger = logging.getLogger(__name__)
+
+# Namespace for in-progress scenario sessions in the state backend
+SESSIONS = "sessions"
+
+# Session used by clients that don't send a session id
+DEFAULT_SESSION_ID = "default"
+
+# Sessions untouched for this long are abandoned: they read as missing and are pruned
+SESSION_TTL_SECONDS = float(os.environ.get("SESSION_TTL_SECONDS", 3600))
+
 @dataclass
 class SimulationResult:
     scenario_id: str
@@ -11,16 +30,19 @@ class SimulationResult:
     max_score: int
     performance_level: str
     feedback: List[str]
-    lessons_learned: List[str]
+    lessons_learned: Tuple[str, ...]
+    timestamp: str
 
 class ScenarioEngine:
-    def __init__(self, scenarios_file: str = "data/scenarios.json"):
+    def __init__(self, scenarios_file: str = "data/scenarios.json", result_exporter: Optional[ResultExporter] = None,
+                 state: Optional[StateBackend] = None, session_ttl: float = SESSION_TTL_SECONDS):
         self.scenarios = self._load_scenarios(scenarios_file)
-        self.current_scenario = None
-        self.user_choices = []
-        self.score = 0
-        self.max_score = 0
-        self.feedback = []
+        self.content_version = content_version(self.scenarios)
+        self.lessons_by_scenario = self._build_lessons(self.scenarios)
+        self.result_exporter = result_exporter
+        # In-progress sessions live in the state backend so any worker can serve them
+        self.state = state if state is not None else InMemoryStateBackend()
+        self.session_ttl = session_ttl
     
     def _load_scenarios(self, file_path: str) -> Dict:
         """Load scenarios from JSON file"""
@@ -56,25 +78,30 @@ class ScenarioEngine:
         else:
             return "advanced"
     
-    def start_scenario(self, scenario_id: str) -> Dict:
+    def start_scenario(self, scenario_id: str, session_id: str = DEFAULT_SESSION_ID) -> Dict:
         """Start a specific scenario"""
         scenario = self._find_scenario(scenario_id)
         if not scenario:
             return {"error": "Scenario not found"}
         
-        self.current_scenario = scenario
-        self.user_choices = []
-        self.score = 0
-        self.max_score = 0
-        self.feedback = []
-        
         # Calculate max possible score
+        max_score = 0
         for choice in scenario.get("choices", []):
-            self.max_score += choice.get("score", 0)
+            max_score += choice.get("score", 0)
         
         if "follow_up_choices" in scenario:
             for choice in scenario.get("follow_up_choices", []):
-                self.max_score += choice.get("score", 0)
+                max_score += choice.get("score", 0)
+        
+        self.state.set(SESSIONS, session_id, {
+            "id": session_id,
+            "scenario_id": scenario["id"],
+            "user_choices": [],
+            "score": 0,
+            "max_score": max_score,
+            "feedback": [],
+            "updated_at": datetime.now().isoformat()
+        })
         
         return {
             "scenario": {
@@ -101,22 +128,62 @@ class ScenarioEngine:
                 return scenario
         return None
     
-    def submit_choice(self, choice_id: str) -> Dict:
-        """Submit a choice for the current scenario"""
-        if not self.current_scenario:
+    def _is_expired(self, session: Dict) -> bool:
+        # Sessions stored before id and updated_at were recorded count as just updated
+        updated_at = session.get("updated_at")
+        if updated_at is None:
+            return False
+        return (datetime.now() - datetime.fromisoformat(updated_at)).total_seconds() > self.session_ttl
+
+    def _get_session(self, session_id: str) -> Optional[Dict]:
+        """The session, or None if it is missing or abandoned (an abandoned one is deleted)"""
+        session = self.state.get(SESSIONS, session_id)
+        if session is not None and self._is_expired(session):
+            self.state.delete(SESSIONS, session_id)
+            return None
+        return session
+
+    def prune_sessions(self) -> int:
+        """Delete sessions untouched for longer than the TTL"""
+        expired = [session["id"] for session in self.state.values(SESSIONS) if self._is_expired(session)]
+        for session_id in expired:
+            self.state.delete(SESSIONS, session_id)
+        return len(expired)
+
+    async def run_session_pruner(self, interval: float) -> None:
+        """Periodically prune abandoned sessions until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.prune_sessions()
+            except StateBusy:
+                logger.warning("session_pruner_state_busy")
+
+    def submit_choice(self, choice_id: str, session_id: str = DEFAULT_SESSION_ID) -> Dict:
+        """Submit a choice for the session's current scenario"""
+        session = self._get_session(session_id)
+        scenario = self._find_scenario(session["scenario_id"]) if session else None
+        if not scenario:
             return {"error": "No active scenario"}
         
         # Find the choice in current scenario
-        choice = self._find_choice(choice_id)
+        choice = self._find_choice(scenario, choice_id)
         if not choice:
             return {"error": "Choice not found"}
         
-        self.user_choices.append(choice_id)
-        self.score += choice.get("score", 0)
-        self.feedback.append(choice.get("explanation", ""))
+        def record_choice(stored: Dict) -> None:
+            stored["user_choices"].append(choice_id)
+            stored["score"] += choice.get("score", 0)
+            stored["feedback"].append(choice.get("explanation", ""))
+            stored["updated_at"] = datetime.now().isoformat()
+        
+        # Atomic so concurrent choices for one session (possibly on other workers) are not lost
+        session = self.state.update(SESSIONS, session_id, record_choice)
+        if not session:
+            return {"error": "No active scenario"}
         
         # Check if there's a follow-up question
-        if "follow_up" in self.current_scenario and len(self.user_choices) == 1:
+        if "follow_up" in scenario and len(session["user_choices"]) == 1:
             return {
                 "choice_result": {
                     "correct": choice.get("correct", False),
@@ -124,65 +191,70 @@ class ScenarioEngine:
                     "score": choice.get("score", 0)
                 },
                 "follow_up": {
-                    "question": self.current_scenario["follow_up"],
+                    "question": scenario["follow_up"],
                     "choices": [
                         {
                             "id": follow_choice["id"],
                             "text": follow_choice["text"]
                         }
-                        for follow_choice in self.current_scenario.get("follow_up_choices", [])
+                        for follow_choice in scenario.get("follow_up_choices", [])
                     ]
                 }
             }
         else:
             # Scenario complete
-            return self._complete_scenario()
+            return self._complete_scenario(scenario, session, session_id)
     
-    def _find_choice(self, choice_id: str) -> Optional[Dict]:
-        """Find choice by ID in current scenario"""
-        if not self.current_scenario:
-            return None
-        
+    def _find_choice(self, scenario: Dict, choice_id: str) -> Optional[Dict]:
+        """Find choice by ID in a scenario"""
         # Check main choices
-        for choice in self.current_scenario.get("choices", []):
+        for choice in scenario.get("choices", []):
             if choice["id"] == choice_id:
                 return choice
         
         # Check follow-up choices
-        for choice in self.current_scenario.get("follow_up_choices", []):
+        for choice in scenario.get("follow_up_choices", []):
             if choice["id"] == choice_id:
                 return choice
         
         return None
     
-    def _complete_scenario(self) -> Dict:
-        """Complete the current scenario and return results"""
-        if not self.current_scenario:
-            return {"error": "No active scenario"}
+    def _complete_scenario(self, scenario: Dict, session: Dict, session_id: str) -> Dict:
+        """Complete the session's scenario and return results"""
+        score = session["score"]
+        max_score = session["max_score"]
         
         # Calculate performance level
-        score_percentage = (self.score / self.max_score) * 100 if self.max_score > 0 else 0
+        score_percentage = (score / max_score) * 100 if max_score > 0 else 0
         performance_level = self._get_performance_level(score_percentage)
         
         # Generate lessons learned
-        lessons = self._generate_lessons_learned()
+        lessons = self._generate_lessons_learned(scenario)
         
         result = SimulationResult(
-            scenario_id=self.current_scenario["id"],
-            user_choices=self.user_choices.copy(),
-            total_score=self.score,
-            max_score=self.max_score,
+            scenario_id=scenario["id"],
+            user_choices=session["user_choices"],
+            total_score=score,
+            max_score=max_score,
             performance_level=performance_level,
-            feedback=self.feedback.copy(),
-            lessons_learned=lessons
+            feedback=session["feedback"],
+            lessons_learned=lessons,
+            timestamp=datetime.now().isoformat()
         )
         
+        if self.result_exporter:
+            self.result_exporter.record(result)
+        
+        logger.info("scenario_completed", extra={
+            "scenario_id": result.scenario_id,
+            "choices": len(result.user_choices),
+            "score": result.total_score,
+            "max_score": result.max_score,
+            "performance_level": result.performance_level
+        })
+        
         # Reset for next scenario
-        self.current_scenario = None
-        self.user_choices = []
-        self.score = 0
-        self.max_score = 0
-        self.feedback = []
+        self.state.delete(SESSIONS, session_id)
         
         return {
             "scenario_complete": True,
@@ -209,57 +281,56 @@ class ScenarioEngine:
         else:
             return "dangerous"
     
-    def _generate_lessons_learned(self) -> List[str]:
-        """Generate lessons based on the scenario and choices made"""
-        lessons = []
+    def _build_lessons(self, catalog: Dict) -> Dict[str, Tuple[str, ...]]:
+        """Precompute the immutable lessons tuple for every scenario in the catalog.
+
+        Lessons come from the catalog's "lessons" section: location-specific lessons
+        followed by the general ones. A scenario can replace its location lessons
+        with its own "lessons" list. Scenarios sharing a location share one tuple.
+        """
+        lessons_config = catalog.get("lessons", {})
+        general = tuple(lessons_config.get("general", []))
+        by_location = {
+            location: tuple(location_lessons) + general
+            for location, location_lessons in lessons_config.get("by_location", {}).items()
+        }
         
-        if self.current_scenario:
-            scenario_type = self.current_scenario.get("location", "general")
-            
-            if scenario_type == "apartment":
-                lessons.extend([
-                    "🏠 Keep emergency supplies in your bedroom for nighttime earthquakes",
-                    "🔦 Have a flashlight and sturdy shoes beside your bed",
-                    "📋 Practice Drop, Cover, Hold On from your bed"
-                ])
-            elif scenario_type == "office":
-                lessons.extend([
-                    "🏢 Know your building's evacuation routes",
-                    "🚪 Never use elevators during or after an earthquake",
-                    "👥 Help colleagues but don't endanger yourself"
-                ])
-            elif scenario_type == "school":
-                lessons.extend([
-                    "🏫 Schools should practice earthquake drills regularly",
-                    "📚 Take cover under desks, away from windows",
-                    "👨‍🏫 Teachers: Stay calm and give clear directions"
-                ])
-            elif scenario_type == "mall":
-                lessons.extend([
-                    "🏬 In crowded places, avoid panic and stampedes",
-                    "🚪 Know multiple exit routes",
-                    "🛍️ Don't stop to collect belongings during evacuation"
-                ])
-            
-            # Add general lessons
-            lessons.extend([
-                "⚡ Remember: DROP, COVER, HOLD ON is the universal response",
-                "📱 Have emergency contacts saved in your phone",
-                "🎒 Prepare an emergency kit for your home and workplace"
-            ])
+        lessons_by_scenario = {}
+        for scenario in catalog.get("scenarios", []):
+            if "lessons" in scenario:
+                lessons_by_scenario[scenario["id"]] = tuple(scenario["lessons"]) + general
+            else:
+                lessons_by_scenario[scenario["id"]] = by_location.get(scenario.get("location", "general"), general)
         
-        return lessons
+        return lessons_by_scenario
+    
+    def _generate_lessons_learned(self, scenario: Dict) -> Tuple[str, ...]:
+        """Look up the precomputed lessons for a scenario"""
+        return self.lessons_by_scenario.get(scenario["id"], ())
+    
+    def get_session_status(self, session_id: str = DEFAULT_SESSION_ID) -> Dict:
+        """Get progress of a session's current scenario"""
+        session = self._get_session(session_id)
+        if not session:
+            return {"has_active_scenario": False, "current_score": 0, "max_score": 0, "choices_made": 0}
+        
+        return {
+            "has_active_scenario": True,
+            "current_score": session["score"],
+            "max_score": session["max_score"],
+            "choices_made": len(session["user_choices"])
+        }
     
-    def get_random_scenario(self) -> Dict:
+    def get_random_scenario(self, session_id: str = DEFAULT_SESSION_ID) -> Dict:
         """Get a random scenario for quick practice"""
         scenarios = self.scenarios.get("scenarios", [])
         if not scenarios:
             return {"error": "No scenarios available"}
         
         random_scenario = random.choice(scenarios)
-        return self.start_scenario(random_scenario["id"])
+        return self.start_scenario(random_scenario["id"], session_id)
     
-    def get_scenario_by_location(self, location: str) -> Dict:
+    def get_scenario_by_location(self, location: str, session_id: str = DEFAULT_SESSION_ID) -> Dict:
         """Get a scenario for a specific location"""
         matching_scenarios = [
             scenario for scenario in self.scenarios.get("scenarios", [])
@@ -270,7 +341,11 @@ class ScenarioEngine:
             return {"error": f"No scenarios available for location: {location}"}
         
         scenario = random.choice(matching_scenarios)
-        return self.start_scenario(scenario["id"])
+        return self.start_scenario(scenario["id"], session_id)
 
 # Global scenario engine instance
-scenario_engine = ScenarioEngine() 
\ No newline at end of file
+scenario_engine = ScenarioEngine(
+    scenarios_file=os.environ.get("SCENARIOS_FILE", "data/scenarios.json"),
+    result_exporter=create_result_exporter(),
+    state=state_backend
+) 
\ No newline at end of file
@@ -0,0 +1,63 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+class IncidentArchive:
+    """Cold storage for archived incidents: a SQLite file outside the hot state, shared by all workers"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS archived_incidents ("
+            "id TEXT PRIMARY KEY, incident TEXT NOT NULL, archived_at REAL NOT NULL)"
+        )
+        self._connection().execute(
+            "CREATE INDEX IF NOT EXISTS archived_incidents_archived_at ON archived_incidents (archived_at)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers proceed while another worker writes"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, incident: Dict) -> None:
+        self._connection().execute(
+            "INSERT OR REPLACE INTO archived_incidents (id, incident, archived_at) VALUES (?, ?, ?)",
+            (incident["id"], json.dumps(incident), time.time())
+        )
+
+    def get(self, incident_id: str) -> Optional[Dict]:
+        row = self._connection().execute(
+            "SELECT incident FROM archived_incidents WHERE id = ?", (incident_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list(self, limit: int = 50, offset: int = 0) -> List[Dict]:
+        """A page of archived incidents, most recently archived first"""
+        rows = self._connection().execute(
+            "SELECT incident FROM archived_incidents ORDER BY archived_at DESC LIMIT ? OFFSET ?", (limit, offset)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM archived_incidents").fetchone()[0]
+
+def create_incident_archive() -> IncidentArchive:
+    return IncidentArchive(os.environ.get("INCIDENT_ARCHIVE_DB_PATH", "runtime/incident_archive.db"))
+
+# Global archive for incidents moved out of the hot set
+incident_archive = create_incident_archive()
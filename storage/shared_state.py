@@ -0,0 +1,222 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+# How long a call made on the event loop waits for another worker's write lock; other threads wait the full
+# LOCK_TIMEOUT_SECONDS
+STATE_BUSY_TIMEOUT_SECONDS = float(os.environ.get("STATE_BUSY_TIMEOUT_SECONDS", 0.25))
+LOCK_TIMEOUT_SECONDS = 30.0
+
+class StateBusy(RuntimeError):
+    """Raised when the state database stayed locked by another worker for longer than the call may wait"""
+
+class StateBackend(ABC):
+    """Key-value store for session and incident state, grouped by namespace"""
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: Dict) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def add(self, namespace: str, key: str, value: Dict) -> bool:
+        """Store value only if the key is absent; True if it was stored"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(self, namespace: str, key: str, mutate: Callable[[Dict], None]) -> Optional[Dict]:
+        """Atomically apply mutate() to a stored value and return it, or None if missing"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def values(self, namespace: str) -> List[Dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def count(self, namespace: str) -> int:
+        raise NotImplementedError
+
+class InMemoryStateBackend(StateBackend):
+    """Process-local state; only suitable for a single worker"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Optional[Dict]:
+        return self._data.get(namespace, {}).get(key)
+
+    def set(self, namespace: str, key: str, value: Dict) -> None:
+        with self._lock:
+            self._data.setdefault(namespace, {})[key] = value
+
+    def add(self, namespace: str, key: str, value: Dict) -> bool:
+        with self._lock:
+            entries = self._data.setdefault(namespace, {})
+            if key in entries:
+                return False
+            entries[key] = value
+            return True
+
+    def update(self, namespace: str, key: str, mutate: Callable[[Dict], None]) -> Optional[Dict]:
+        with self._lock:
+            value = self._data.get(namespace, {}).get(key)
+            if value is not None:
+                mutate(value)
+            return value
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._data.get(namespace, {}).pop(key, None)
+
+    def values(self, namespace: str) -> List[Dict]:
+        return list(self._data.get(namespace, {}).values())
+
+    def count(self, namespace: str) -> int:
+        return len(self._data.get(namespace, {}))
+
+class SQLiteStateBackend(StateBackend):
+    """State stored in a SQLite file so every worker process on a node sees the same data.
+
+    Calls made on the event loop would stall every request of the worker while
+    they wait for a lock, so they wait at most busy_timeout and then raise
+    StateBusy. Calls from other threads wait up to LOCK_TIMEOUT_SECONDS.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = STATE_BUSY_TIMEOUT_SECONDS):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS state ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers proceed while another worker writes"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT_SECONDS, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.timeout = LOCK_TIMEOUT_SECONDS
+
+        try:
+            asyncio.get_running_loop()
+            timeout = self.busy_timeout
+        except RuntimeError:
+            timeout = LOCK_TIMEOUT_SECONDS
+        if timeout != self._local.timeout:
+            conn.execute(f"PRAGMA busy_timeout = {int(timeout * 1000)}")
+            self._local.timeout = timeout
+        return conn
+
+    @contextmanager
+    def _locked_as_busy(self):
+        try:
+            yield
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e) or "busy" in str(e):
+                raise StateBusy(f"State database is locked by another worker: {self.path}") from e
+            raise
+
+    def get(self, namespace: str, key: str) -> Optional[Dict]:
+        with self._locked_as_busy():
+            row = self._connection().execute(
+                "SELECT value FROM state WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace: str, key: str, value: Dict) -> None:
+        with self._locked_as_busy():
+            self._connection().execute(
+                "INSERT OR REPLACE INTO state (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), time.time())
+            )
+
+    def add(self, namespace: str, key: str, value: Dict) -> bool:
+        with self._locked_as_busy():
+            cursor = self._connection().execute(
+                "INSERT OR IGNORE INTO state (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), time.time())
+            )
+        return cursor.rowcount == 1
+
+    def update(self, namespace: str, key: str, mutate: Callable[[Dict], None]) -> Optional[Dict]:
+        conn = self._connection()
+        # IMMEDIATE takes the write lock up front so concurrent updates serialize
+        with self._locked_as_busy():
+            conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM state WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            value = json.loads(row[0])
+            mutate(value)
+            conn.execute(
+                "UPDATE state SET value = ?, updated_at = ? WHERE namespace = ? AND key = ?",
+                (json.dumps(value), time.time(), namespace, key)
+            )
+            conn.execute("COMMIT")
+            return value
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._locked_as_busy():
+            self._connection().execute(
+                "DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+
+    def values(self, namespace: str) -> List[Dict]:
+        with self._locked_as_busy():
+            rows = self._connection().execute(
+                "SELECT value FROM state WHERE namespace = ? ORDER BY updated_at", (namespace,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self, namespace: str) -> int:
+        with self._locked_as_busy():
+            return self._connection().execute(
+                "SELECT COUNT(*) FROM state WHERE namespace = ?", (namespace,)
+            ).fetchone()[0]
+
+def create_state_backend() -> StateBackend:
+    """Create the backend selected by STATE_BACKEND (memory or sqlite)"""
+    backend = os.environ.get("STATE_BACKEND", "memory").lower()
+
+    if backend == "memory":
+        return InMemoryStateBackend()
+    elif backend == "sqlite":
+        return SQLiteStateBackend(os.environ.get("STATE_DB_PATH", "runtime/shared_state.db"))
+    else:
+        raise ValueError(f"Unknown STATE_BACKEND: {backend}")
+
+# Global state backend shared by the scenario engine and the coordinator
+state_backend = create_state_backend()
@@ -0,0 +1,7 @@
+import hashlib
+import json
+
+def content_version(data) -> str:
+    """Short stable hash of JSON-serialisable content, used as a cache key and ETag"""
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
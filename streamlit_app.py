@@ -1,10 +1,11 @@
 import streamlit as st
 import requests
 import json
-import asyncio
-import aiohttp
+import uuid
 from datetime import datetime
 
+from api_client import APIClient, API_BASE
+
 # Page configuration
 st.set_page_config(
     page_title="Disaster Ready: Earthquake Response Simulator",
@@ -13,8 +14,41 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# API base URL - adjust for your deployment
-API_BASE = "http://localhost:8000"
+@st.cache_resource
+def get_api_client() -> APIClient:
+    """One pooled API client shared by every session and rerun"""
+    return APIClient()
+
+api = get_api_client()
+
+# How long to trust fetched content before revalidating it with the API
+CONTENT_REVALIDATE_SECONDS = 30
+
+@st.cache_resource
+def content_store():
+    """Last fetched body of each content endpoint with its ETag, shared by every session"""
+    return {}
+
+@st.cache_data(ttl=CONTENT_REVALIDATE_SECONDS, show_spinner=False)
+def fetch_content(path):
+    """Fetch static content, sending the stored copy's ETag so an unchanged body comes back as 304"""
+    store = content_store()
+    etag, content = store.get(path, (None, None))
+    response = api.get(path, headers={"If-None-Match": etag} if etag else None)
+    if response.status_code == 304 and content is not None:
+        return content
+    response.raise_for_status()
+    # The version comes with the body it describes, so the two can never disagree
+    content = response.json()
+    store[path] = (response.headers.get("ETag"), content)
+    return content
+
+def get_versioned_content(path):
+    """Get cacheable content from the API, or None if the API returned an error"""
+    try:
+        return fetch_content(path)
+    except requests.HTTPError:
+        return None
 
 def init_session_state():
     """Initialize session state variables"""
@@ -26,6 +60,8 @@ def init_session_state():
         st.session_state.chat_history = []
     if 'user_location' not in st.session_state:
         st.session_state.user_location = "general"
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
 
 def render_header():
     """Render the main header"""
@@ -125,9 +161,8 @@ def render_scenarios():
     
     try:
         # Get available scenarios
-        response = requests.get(f"{API_BASE}/scenarios")
-        if response.status_code == 200:
-            scenarios_data = response.json()
+        scenarios_data = get_versioned_content("/scenarios")
+        if scenarios_data:
             scenarios = scenarios_data.get("scenarios", [])
             
             if not st.session_state.current_scenario:
@@ -138,8 +173,8 @@ def render_scenarios():
                 with col1:
                     if st.button("🎲 Random Scenario", type="primary"):
                         try:
-                            start_response = requests.post(f"{API_BASE}/scenario/start", 
-                                                         json={"random": True})
+                            start_response = api.post("/scenario/start", 
+                                                    json={"random": True, "session_id": st.session_state.session_id})
                             if start_response.status_code == 200:
                                 st.session_state.current_scenario = start_response.json()
                                 st.rerun()
@@ -154,8 +189,8 @@ def render_scenarios():
                     )
                     if location_scenario and st.button("Start Location Scenario"):
                         try:
-                            start_response = requests.post(f"{API_BASE}/scenario/start",
-                                                         json={"location": location_scenario})
+                            start_response = api.post("/scenario/start",
+                                                    json={"location": location_scenario, "session_id": st.session_state.session_id})
                             if start_response.status_code == 200:
                                 st.session_state.current_scenario = start_response.json()
                                 st.rerun()
@@ -170,8 +205,8 @@ def render_scenarios():
                         st.markdown(f"**Description:** {scenario['description']}")
                         if st.button(f"Start {scenario['title']}", key=scenario['id']):
                             try:
-                                start_response = requests.post(f"{API_BASE}/scenario/start",
-                                                             json={"scenario_id": scenario['id']})
+                                start_response = api.post("/scenario/start",
+                                                        json={"scenario_id": scenario['id'], "session_id": st.session_state.session_id})
                                 if start_response.status_code == 200:
                                     st.session_state.current_scenario = start_response.json()
                                     st.rerun()
@@ -187,7 +222,7 @@ def render_scenarios():
             
     except Exception as e:
         st.error(f"Connection error: {e}")
-        st.info("Make sure the API server is running on http://localhost:8000")
+        st.info(f"Make sure the API server is running on {API_BASE}")
 
 def render_active_scenario():
     """Render an active scenario"""
@@ -219,8 +254,8 @@ def render_active_scenario():
         for choice in choices:
             if st.button(choice["text"], key=choice["id"], type="secondary"):
                 try:
-                    choice_response = requests.post(f"{API_BASE}/scenario/choice",
-                                                  json={"choice_id": choice["id"]})
+                    choice_response = api.post("/scenario/choice",
+                                             json={"choice_id": choice["id"], "session_id": st.session_state.session_id})
                     if choice_response.status_code == 200:
                         result = choice_response.json()
                         handle_scenario_result(result)
@@ -253,8 +288,8 @@ def handle_scenario_result(result):
             for choice in result["follow_up"]["choices"]:
                 if st.button(choice["text"], key=f"followup_{choice['id']}", type="secondary"):
                     try:
-                        followup_response = requests.post(f"{API_BASE}/scenario/choice",
-                                                        json={"choice_id": choice["id"]})
+                        followup_response = api.post("/scenario/choice",
+                                                   json={"choice_id": choice["id"], "session_id": st.session_state.session_id})
                         if followup_response.status_code == 200:
                             final_result = followup_response.json()
                             handle_scenario_completion(final_result)
@@ -327,11 +362,12 @@ def render_expert_chat():
             # Get response from API
             try:
                 with st.spinner("Getting expert advice..."):
-                    response = requests.post(f"{API_BASE}/ask/direct",
-                                           json={
-                                               "question": user_question,
-                                               "location": st.session_state.user_location
-                                           })
+                    response = api.post("/ask/direct",
+                                      json={
+                                          "question": user_question,
+                                          "location": st.session_state.user_location,
+                                          "session_id": st.session_state.session_id
+                                      })
                     
                     if response.status_code == 200:
                         result = response.json()
@@ -369,10 +405,8 @@ def render_learn_basics():
     st.header("📚 Earthquake Safety Basics")
     
     try:
-        response = requests.get(f"{API_BASE}/learn/basics")
-        if response.status_code == 200:
-            basics = response.json()
-            
+        basics = get_versioned_content("/learn/basics")
+        if basics:
             # DROP, COVER, HOLD ON
             st.subheader("🚨 DROP, COVER, and HOLD ON")
             st.success(basics["drop_cover_hold"]["description"])
@@ -393,10 +427,8 @@ def render_learn_basics():
                     st.markdown(f"• {tip}")
         
         # Regional information
-        response = requests.get(f"{API_BASE}/learn/southeast-asia")
-        if response.status_code == 200:
-            regional = response.json()
-            
+        regional = get_versioned_content("/learn/southeast-asia")
+        if regional:
             st.markdown("---")
             st.subheader("🌏 Southeast Asia Information")
             
@@ -436,39 +468,37 @@ def render_emergency_contacts():
     """Render emergency contacts based on location"""
     st.header("📞 Emergency Contacts")
     
+    location = st.session_state.user_location
+    
+    def ask(question):
+        return ("POST", "/ask/direct", {"question": question, "location": location})
+    
     try:
-        response = requests.post(f"{API_BASE}/ask/direct",
-                               json={
-                                   "question": f"emergency contacts for {st.session_state.user_location}",
-                                   "location": st.session_state.user_location
-                               })
+        # Reserve space for the contacts so they render above the buttons
+        contacts_area = st.container()
         
-        if response.status_code == 200:
-            result = response.json()
-            st.markdown(result["response"])
-            
         # Additional resources
         st.markdown("---")
         st.subheader("🏥 Find Nearby Resources")
         
-        if st.button("Find Hospitals"):
-            hospital_response = requests.post(f"{API_BASE}/ask/direct",
-                                            json={
-                                                "question": f"nearest hospitals in {st.session_state.user_location}",
-                                                "location": st.session_state.user_location
-                                            })
-            if hospital_response.status_code == 200:
-                result = hospital_response.json()
-                st.markdown(result["response"])
+        find_hospitals = st.button("Find Hospitals")
+        find_centers = st.button("Find Evacuation Centers")
+        
+        # Issue the contacts lookup and any requested resource lookups concurrently
+        calls = [ask(f"emergency contacts for {location}")]
+        if find_hospitals:
+            calls.append(ask(f"nearest hospitals in {location}"))
+        if find_centers:
+            calls.append(ask(f"evacuation centers in {location}"))
+        
+        contacts_result, *resource_results = api.gather(calls)
+        
+        if contacts_result:
+            with contacts_area:
+                st.markdown(contacts_result["response"])
         
-        if st.button("Find Evacuation Centers"):
-            evacuation_response = requests.post(f"{API_BASE}/ask/direct",
-                                               json={
-                                                   "question": f"evacuation centers in {st.session_state.user_location}",
-                                                   "location": st.session_state.user_location
-                                               })
-            if evacuation_response.status_code == 200:
-                result = evacuation_response.json()
+        for result in resource_results:
+            if result:
                 st.markdown(result["response"])
     
     except Exception as e:
@@ -0,0 +1,38 @@
+import pytest
+
+from agent.earthquake_advisor import get_earthquake_safety_advice, get_emergency_contacts
+from agent.fallback_responder import rule_based_answer
+
+GENERAL_ADVICE = get_earthquake_safety_advice("general").strip()
+DRIVING_ADVICE = get_earthquake_safety_advice("driving").strip()
+OFFICE_ADVICE = get_earthquake_safety_advice("office").strip()
+GENERAL_CONTACTS = get_emergency_contacts("general").strip()
+
+@pytest.mark.parametrize("question", [
+    "My child is scared, what do I do?",
+    "I take care of my grandmother, what should I do?",
+    "Is my network down?",
+    "Something unusual is happening"
+])
+def test_words_inside_other_words_do_not_pick_a_situation(question):
+    answer = rule_based_answer(question)
+    assert answer.startswith(GENERAL_ADVICE)
+    assert DRIVING_ADVICE not in answer
+    assert OFFICE_ADVICE not in answer
+
+@pytest.mark.parametrize("question,situation", [
+    ("What should I do if I am driving?", "driving"),
+    ("I'm in my car on the highway", "driving"),
+    ("What if it happens while I am asleep?", "sleeping"),
+    ("I am at my desk at work", "office"),
+    ("We are in a classroom", "school")
+])
+def test_situation_keywords_match_whole_words_and_stems(question, situation):
+    assert rule_based_answer(question).startswith(get_earthquake_safety_advice(situation).strip())
+
+def test_contacts_need_a_contact_word():
+    assert GENERAL_CONTACTS not in rule_based_answer("I recall the drill, what now?")
+    assert GENERAL_CONTACTS in rule_based_answer("Who should I call?")
+
+def test_location_is_taken_from_the_question():
+    assert get_emergency_contacts("bangkok").strip() in rule_based_answer("Where is the nearest hospital in Bangkok?")
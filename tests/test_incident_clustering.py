@@ -0,0 +1,60 @@
+import asyncio
+
+from agent.agent_pool import AgentPool
+from agent.incident_clustering import candidate_keys, distance_meters, is_specific_place
+from agent.incident_events import IncidentEventBus
+from agent.multi_agent_coordinator import MultiAgentCoordinator
+from agent.scheduler import PriorityScheduler
+from storage.incident_archive import IncidentArchive
+from storage.shared_state import InMemoryStateBackend
+
+class FakeAgent:
+    async def ainvoke(self, prompt: str) -> str:
+        return "Send two ambulances."
+
+def make_coordinator(tmp_path) -> MultiAgentCoordinator:
+    coordinator = MultiAgentCoordinator(
+        state=InMemoryStateBackend(),
+        events=IncidentEventBus(),
+        scheduler=PriorityScheduler(),
+        archive=IncidentArchive(str(tmp_path / "archive.db"))
+    )
+    coordinator.agent_pools = {role: AgentPool(FakeAgent, 2) for role in coordinator.agent_pools}
+    return coordinator
+
+def create(coordinator, incident_id, location, latitude=None, longitude=None):
+    return asyncio.run(coordinator.create_incident(incident_id, "earthquake", location, "high", latitude, longitude))
+
+def test_city_names_are_too_coarse_to_cluster_on():
+    assert not is_specific_place("Bangkok")
+    assert not is_specific_place("Sukhumvit Road")
+    assert is_specific_place("Sukhumvit Soi 11")
+    assert is_specific_place("Siam Paragon, Pathum Wan, Bangkok")
+    assert candidate_keys("earthquake", "Bangkok") == []
+
+def test_distance_meters():
+    assert distance_meters(13.7563, 100.5018, 13.7563, 100.5018) == 0
+    assert 1100 < distance_meters(13.75, 100.50, 13.76, 100.50) < 1120
+
+def test_reports_naming_only_the_city_are_not_linked(tmp_path):
+    coordinator = make_coordinator(tmp_path)
+    create(coordinator, "inc1", "Bangkok")
+    second = create(coordinator, "inc2", "bangkok")
+    assert "primary_incident_id" not in coordinator.state.get("incidents", "inc2")
+    assert not second.get("reused_from")
+
+def test_reports_at_the_same_address_are_linked(tmp_path):
+    coordinator = make_coordinator(tmp_path)
+    create(coordinator, "inc1", "123 Sukhumvit Road, Bangkok")
+    create(coordinator, "inc2", "123 sukhumvit road bangkok")
+    assert coordinator.state.get("incidents", "inc2")["primary_incident_id"] == "inc1"
+
+def test_reports_with_coordinates_must_be_within_the_radius(tmp_path):
+    coordinator = make_coordinator(tmp_path)
+    create(coordinator, "inc1", "Bangkok", 13.7500, 100.5000)
+    # ~110 m away: same incident
+    create(coordinator, "inc2", "Bangkok", 13.7510, 100.5000)
+    # Adjacent cell but ~1 km away: a separate incident
+    create(coordinator, "inc3", "Bangkok", 13.7590, 100.5000)
+    assert coordinator.state.get("incidents", "inc2")["primary_incident_id"] == "inc1"
+    assert "primary_incident_id" not in coordinator.state.get("incidents", "inc3")
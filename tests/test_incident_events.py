@@ -0,0 +1,41 @@
+import asyncio
+
+from agent.incident_events import INCIDENT_CREATED, STREAM_RESET, IncidentEventBus
+
+def first_events(bus, count, **subscribe_args):
+    async def collect():
+        events = []
+        async for event in bus.subscribe(**subscribe_args):
+            events.append(event)
+            if len(events) == count:
+                return events
+    return asyncio.run(asyncio.wait_for(collect(), 1))
+
+def test_reconnect_to_the_same_bus_replays_missed_events():
+    bus = IncidentEventBus()
+    first = bus.publish(INCIDENT_CREATED, "a", {})
+    bus.publish(INCIDENT_CREATED, "b", {})
+    since = bus.parse_event_id(bus.event_id(first))
+    assert [event["incident_id"] for event in first_events(bus, 1, since=since)] == ["b"]
+
+def test_ids_from_another_bus_are_reset_not_replayed():
+    worker_a, worker_b = IncidentEventBus(), IncidentEventBus()
+    seen = worker_a.publish(INCIDENT_CREATED, "a", {})
+    worker_b.publish(INCIDENT_CREATED, "b", {})
+    worker_b.publish(INCIDENT_CREATED, "c", {})
+
+    assert worker_b.parse_event_id(worker_a.event_id(seen)) is None
+    reset = first_events(worker_b, 1, reset="unknown_stream")[0]
+    assert reset["type"] == STREAM_RESET
+    # Resuming from the reset's id on the same worker replays nothing twice
+    assert worker_b.parse_event_id(worker_b.event_id(reset)) == 2
+
+    # A bare sequence this bus never issued is reset as well
+    assert first_events(worker_b, 1, since=5)[0]["data"] == {"reason": "unknown_stream"}
+
+def test_events_older_than_the_history_are_reset():
+    bus = IncidentEventBus(history_size=2)
+    for incident_id in "abcd":
+        bus.publish(INCIDENT_CREATED, incident_id, {})
+    assert first_events(bus, 1, since=1)[0]["data"] == {"reason": "history_gap"}
+    assert [event["incident_id"] for event in first_events(bus, 2, since=2)] == ["c", "d"]
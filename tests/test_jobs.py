@@ -0,0 +1,105 @@
+import asyncio
+
+from agent.agent_pool import AgentPool
+from agent.incident_events import IncidentEventBus
+from agent.jobs import JobManager
+from agent.multi_agent_coordinator import MultiAgentCoordinator
+from agent.scheduler import PriorityScheduler
+from storage.incident_archive import IncidentArchive
+from storage.shared_state import SQLiteStateBackend
+
+class AgentResultLike:
+    """Stands in for a strands AgentResult: printable, but not JSON-serializable"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def __str__(self) -> str:
+        return self.text
+
+class FakeAgent:
+    async def ainvoke(self, prompt: str) -> AgentResultLike:
+        return AgentResultLike("Send two ambulances.")
+
+def test_incident_job_round_trips_through_sqlite(tmp_path):
+    state = SQLiteStateBackend(str(tmp_path / "state.db"))
+    coordinator = MultiAgentCoordinator(
+        state=state,
+        events=IncidentEventBus(),
+        scheduler=PriorityScheduler(),
+        archive=IncidentArchive(str(tmp_path / "archive.db"))
+    )
+    coordinator.agent_pools = {role: AgentPool(FakeAgent, 2) for role in coordinator.agent_pools}
+    manager = JobManager(state=state, workers=1)
+
+    async def run_incident_job():
+        await coordinator.create_incident("inc1", "earthquake", "Bangkok", "high")
+        return await coordinator.get_full_response("inc1")
+
+    async def scenario():
+        manager.start()
+        try:
+            manager.submit("job1", run_incident_job, incident_id="inc1")
+            await manager._queue.join()
+        finally:
+            await manager.stop()
+
+    asyncio.run(scenario())
+
+    job = SQLiteStateBackend(str(tmp_path / "state.db")).get("jobs", "job1")
+    assert job["status"] == "completed", job.get("error")
+    assert job["result"]["coordinated_response"]["medical"] == "Send two ambulances."
+    assert job["result"]["coordinated_response"]["evacuation"] == "Send two ambulances."
+
+def test_jobs_of_a_restarted_worker_are_failed_and_expire(tmp_path):
+    path = str(tmp_path / "state.db")
+    crashed = JobManager(state=SQLiteStateBackend(path), workers=1, stale_seconds=30)
+
+    async def never_finishes():
+        await asyncio.Event().wait()
+
+    async def crash():
+        crashed.start()
+        crashed.submit("job1", never_finishes)
+        crashed.submit("job2", never_finishes)
+        await asyncio.sleep(0)
+        # The process dies: its tasks stop without finishing the jobs
+        await crashed.stop()
+
+    asyncio.run(crash())
+    state = SQLiteStateBackend(path)
+    assert {job["status"] for job in state.values("jobs")} == {"queued", "running"}
+
+    # Heartbeats stop with the worker
+    for job_id in ("job1", "job2"):
+        state.update("jobs", job_id, lambda job: job.update(heartbeat_at=job["heartbeat_at"] - 31))
+
+    restarted = JobManager(state=state, workers=1, ttl_seconds=3600, stale_seconds=30)
+    assert restarted.get_job("job1")["status"] == "failed"
+    assert restarted.fail_orphaned() == 1
+    assert restarted.get_job("job2")["error"] == "worker lost"
+
+    # Failed orphans expire like any other job
+    restarted.ttl_seconds = 0
+    assert restarted.prune_expired() == 2
+    assert state.count("jobs") == 0
+
+def test_live_jobs_of_another_worker_are_left_alone(tmp_path):
+    state = SQLiteStateBackend(str(tmp_path / "state.db"))
+    owner = JobManager(state=state, workers=1, stale_seconds=30)
+    other = JobManager(state=state, workers=1, stale_seconds=30)
+
+    async def quick():
+        return {}
+
+    async def scenario():
+        owner.start()
+        try:
+            owner.submit("job1", quick)
+            assert other.get_job("job1")["status"] in ("queued", "running")
+            await owner._queue.join()
+        finally:
+            await owner.stop()
+
+    asyncio.run(scenario())
+    assert other.get_job("job1")["status"] == "completed"
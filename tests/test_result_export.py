@@ -0,0 +1,65 @@
+import asyncio
+import csv
+import glob
+import os
+
+from simulation.result_export import ResultExporter
+from simulation.scenario_engine import SimulationResult
+
+def result(scenario_id: str = "home_night") -> SimulationResult:
+    return SimulationResult(
+        scenario_id=scenario_id,
+        user_choices=["stay_bed", "check_injuries"],
+        total_score=20,
+        max_score=20,
+        performance_level="Excellent",
+        feedback=[],
+        lessons_learned=(),
+        timestamp="2026-01-01T00:00:00"
+    )
+
+def exported_rows(directory) -> list:
+    rows = []
+    for path in sorted(glob.glob(os.path.join(str(directory), "results-*.csv"))):
+        with open(path, newline="") as f:
+            rows.extend(row["scenario_id"] for row in csv.DictReader(f))
+    return rows
+
+def test_flusher_writes_results_before_the_file_is_full(tmp_path):
+    exporter = ResultExporter(str(tmp_path), rows_per_file=10000, file_format="csv", flush_seconds=0.01)
+    exporter.record(result())
+
+    async def run_briefly():
+        flusher = asyncio.ensure_future(exporter.run_flusher())
+        await asyncio.sleep(0.2)
+        flusher.cancel()
+
+    asyncio.run(run_briefly())
+    assert exported_rows(tmp_path) == ["home_night"]
+
+def test_rows_of_a_failed_write_are_kept_for_the_next_one(tmp_path, monkeypatch):
+    exporter = ResultExporter(str(tmp_path), rows_per_file=2, file_format="csv")
+    write = exporter._write
+
+    def failing_write(columns, path):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(exporter, "_write", failing_write)
+    exporter.record(result("first"))
+    exporter.record(result("second"))
+    assert exporter.flush() is None
+    assert exported_rows(tmp_path) == []
+
+    # The next full buffer writes the kept rows with the new one
+    monkeypatch.setattr(exporter, "_write", write)
+    exporter.record(result("third"))
+    assert exported_rows(tmp_path) == ["first", "second", "third"]
+    assert not glob.glob(os.path.join(str(tmp_path), "*.tmp"))
+
+def test_buffer_of_a_failing_target_is_bounded(tmp_path, monkeypatch):
+    exporter = ResultExporter(str(tmp_path), rows_per_file=2, file_format="csv", max_buffered_rows=3)
+    monkeypatch.setattr(exporter, "_write", lambda columns, path: (_ for _ in ()).throw(OSError("disk full")))
+    for scenario_id in ("a", "b", "c", "d"):
+        exporter.record(result(scenario_id))
+    assert exporter._buffered_rows == 3
+    assert exporter._buffer["scenario_id"] == ["b", "c", "d"]
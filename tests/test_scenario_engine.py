@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+
+from simulation.scenario_engine import SESSIONS, ScenarioEngine
+from storage.shared_state import SQLiteStateBackend
+
+def age(state, session_id, seconds):
+    then = (datetime.now() - timedelta(seconds=seconds)).isoformat()
+    state.update(SESSIONS, session_id, lambda session: session.update(updated_at=then))
+
+def test_abandoned_sessions_expire_and_are_pruned(tmp_path):
+    state = SQLiteStateBackend(str(tmp_path / "state.db"))
+    engine = ScenarioEngine(state=state, session_ttl=60)
+    scenario_id = engine.get_available_scenarios()[0]["id"]
+
+    for session_id in ("abandoned", "stale", "active"):
+        engine.start_scenario(scenario_id, session_id)
+    age(state, "abandoned", 120)
+    age(state, "stale", 120)
+    age(state, "active", 30)
+
+    # An expired session reads as missing and is deleted on read
+    assert engine.get_session_status("abandoned")["has_active_scenario"] is False
+    assert state.get(SESSIONS, "abandoned") is None
+    assert engine.submit_choice("any", "stale") == {"error": "No active scenario"}
+    assert engine.get_session_status("active")["has_active_scenario"] is True
+
+    engine.start_scenario(scenario_id, "stale")
+    age(state, "stale", 120)
+    assert engine.prune_sessions() == 1
+    assert [session["id"] for session in state.values(SESSIONS)] == ["active"]
@@ -0,0 +1,40 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from storage.shared_state import SQLiteStateBackend, StateBackend, StateBusy
+
+def test_event_loop_calls_give_up_on_a_held_lock(tmp_path):
+    path = str(tmp_path / "state.db")
+    state = SQLiteStateBackend(path, busy_timeout=0.05)
+    state.set("incidents", "a", {"id": "a"})
+
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+
+    async def write():
+        state.update("incidents", "a", lambda incident: incident.update(status="resolved"))
+
+    start = time.monotonic()
+    with pytest.raises(StateBusy):
+        asyncio.run(write())
+    assert time.monotonic() - start < 1
+
+    # Reads go on while the lock is held
+    async def read():
+        return state.get("incidents", "a")
+
+    assert asyncio.run(read()) == {"id": "a"}
+    other.execute("ROLLBACK")
+    asyncio.run(write())
+    assert state.get("incidents", "a")["status"] == "resolved"
+
+def test_backend_missing_an_operation_cannot_be_created():
+    class GetOnlyBackend(StateBackend):
+        def get(self, namespace, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyBackend()